@@ -5,20 +5,95 @@ and provides a unified interface for audit functionality.
 """
 
 import os
-import json
 import logging
+import functools
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any, Tuple
+from typing import List, Dict, Optional, Any, Tuple, Union, Callable, Iterator
 import threading
+from collections import defaultdict, deque
 from concurrent.futures import ThreadPoolExecutor
 
 from .models_audit import (
     AuditRun, AuditConfiguration, PolicyAuditResult, AuditSummary, AuditTrend,
     ReportTemplate, AuditStatus, ComplianceResult, AuditScope, ReportFormat,
-    serialize_audit_run, generate_audit_summary
+    serialize_audit_run, serialize_audit_configuration, generate_audit_summary,
+    dump_json, dumps_json, loads_json
 )
 from .audit_engine import WindowsAuditEngine
 from .report_generator import ReportGenerator
+from .caching import TTLCache
+from .storage import atomic_write, read_bytes
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+try:
+    import simdjson
+    HAS_SIMDJSON = True
+except ImportError:
+    HAS_SIMDJSON = False
+
+def _load_json_document(data: bytes) -> Any:
+    """Parse a stored JSON document, using simdjson for large files when available"""
+    if not HAS_SIMDJSON:
+        return loads_json(data)
+    
+    parser = simdjson.Parser()
+    try:
+        # Proxies into the parser buffer die with the parser, so copy out first
+        document = parser.parse(data)
+        if isinstance(document, simdjson.Object):
+            return document.as_dict()
+        if isinstance(document, simdjson.Array):
+            return document.as_list()
+        return document
+    finally:
+        del parser
+
+# Result transitions between two audits that count as a change; every
+# other pair of results is reported as unchanged
+_TRANSITIONS = {
+    (ComplianceResult.FAIL, ComplianceResult.PASS): 'improved',
+    (ComplianceResult.PASS, ComplianceResult.FAIL): 'degraded',
+}
+
+# Lower-cased searchable text, outcome and reported fields of one policy result
+SearchRow = Tuple[str, ComplianceResult, Dict[str, Any]]
+
+@functools.lru_cache(maxsize=32)
+def _build_term_matcher(terms: Tuple[str, ...]) -> Callable[[str], bool]:
+    """Build a test for whether any of several lower-cased terms occurs in a text"""
+    if not HAS_AHOCORASICK:
+        return lambda text: any(term in text for term in terms)
+    
+    # One automaton pass over the text replaces a substring scan per term
+    automaton = ahocorasick.Automaton()
+    for term in terms:
+        automaton.add_word(term, term)
+    automaton.make_automaton()
+    return lambda text: next(automaton.iter(text), None) is not None
+
+def _parse_iso(value: Any) -> Optional[datetime]:
+    """Parse an ISO timestamp from audit history, or None if it is missing or malformed"""
+    if not value or not isinstance(value, str):
+        return None
+    return _parse_iso_string(value)
+
+@functools.lru_cache(maxsize=4096)
+def _parse_iso_string(value: str) -> Optional[datetime]:
+    """Memoized parse; malformed strings are cached as None so they only fail once"""
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    
+    # History is compared against naive local times, so aware values are converted
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
 
 # =================================================================
 # MAIN AUDIT MANAGER
@@ -30,10 +105,29 @@ class AuditManager:
     Integrates with dashboard, template, and policy systems.
     """
     
+    # Completed audits whose search text and hit fields are kept in memory
+    SEARCH_INDEX_CACHE_SIZE = 64
+    # Results files a history-wide search may read from disk; audits already
+    # in memory or in the search cache do not count
+    SEARCH_MAX_DISK_LOADS = 10
+    # Appended configuration changes folded back into the snapshot file
+    CONFIG_LOG_COMPACT_EVERY = 100
+    # Audit runs loaded ahead of the one being written during an export
+    EXPORT_READ_AHEAD = 4
+    
+    # Directories already created by any manager in this process
+    _ready_dirs = set()
+    
     def __init__(self, data_dir: str = "audit_data"):
         """Initialize audit manager with data storage directory"""
         self.data_dir = data_dir
-        os.makedirs(data_dir, exist_ok=True)
+        self._ensure_dir(data_dir)
+        
+        # Storage paths, resolved once
+        self._configs_path = os.path.join(data_dir, "configurations.json")
+        self._config_log_path = os.path.join(data_dir, "configurations.jsonl")
+        self._trends_path = os.path.join(data_dir, "trends.json")
+        self._log_path = os.path.join(data_dir, "logs", "audit_manager.log")
         
         # Initialize components
         self.audit_engine = WindowsAuditEngine(data_dir)
@@ -46,12 +140,24 @@ class AuditManager:
         self.audit_cache = {}
         self.trend_cache = {}
         self.configuration_cache = {}
+        self._search_entry_cache = TTLCache(maxsize=self.SEARCH_INDEX_CACHE_SIZE, ttl=None)
+        self._dirty_config_ids = set()
+        self._config_log_entries = 0
+        # Guards the configuration cache, its dirty set and the log compaction
+        self._config_lock = threading.Lock()
         
         # Load historical data
         self._load_audit_history()
         
         self.logger.info("AuditManager initialized successfully")
     
+    @classmethod
+    def _ensure_dir(cls, path: str):
+        """Create a directory unless this process has already made sure it exists"""
+        if path not in cls._ready_dirs:
+            os.makedirs(path, exist_ok=True)
+            cls._ready_dirs.add(path)
+    
     def _setup_logging(self) -> logging.Logger:
         """Setup logging for audit manager"""
         logger = logging.getLogger("AuditManager")
@@ -59,10 +165,9 @@ class AuditManager:
         
         # Create file handler if not already exists
         if not logger.handlers:
-            log_file = os.path.join(self.data_dir, "logs", "audit_manager.log")
-            os.makedirs(os.path.dirname(log_file), exist_ok=True)
+            self._ensure_dir(os.path.dirname(self._log_path))
             
-            handler = logging.FileHandler(log_file)
+            handler = logging.FileHandler(self._log_path)
             handler.setLevel(logging.INFO)
             
             formatter = logging.Formatter(
@@ -77,23 +182,26 @@ class AuditManager:
     def _load_audit_history(self):
         """Load historical audit data from storage"""
         try:
-            # Load audit configurations
-            configs_file = os.path.join(self.data_dir, "configurations.json")
-            if os.path.exists(configs_file):
-                with open(configs_file, 'r') as f:
-                    config_data = json.load(f)
-                    # Convert to AuditConfiguration objects
-                    # For now, just store the raw data
-                    self.configuration_cache.update(config_data)
+            # Load audit configurations; a missing file costs one failed open
+            try:
+                config_data = _load_json_document(read_bytes(self._configs_path))
+                # Convert to AuditConfiguration objects
+                # For now, just store the raw data
+                self.configuration_cache.update(config_data)
+            except FileNotFoundError:
+                pass
+            
+            # Replay configuration changes appended since the last snapshot
+            self._replay_configuration_log()
             
             # Load trend data
-            trends_file = os.path.join(self.data_dir, "trends.json")
-            if os.path.exists(trends_file):
-                with open(trends_file, 'r') as f:
-                    trend_data = json.load(f)
-                    # Convert to AuditTrend objects
-                    # For now, just store the raw data
-                    self.trend_cache.update(trend_data)
+            try:
+                trend_data = _load_json_document(read_bytes(self._trends_path))
+                # Convert to AuditTrend objects
+                # For now, just store the raw data
+                self.trend_cache.update(trend_data)
+            except FileNotFoundError:
+                pass
             
             self.logger.info(f"Loaded {len(self.configuration_cache)} configurations and {len(self.trend_cache)} trend datasets")
             
@@ -113,7 +221,9 @@ class AuditManager:
             )
             
             # Store configuration
-            self.configuration_cache[config.audit_id] = config
+            with self._config_lock:
+                self.configuration_cache[config.audit_id] = config
+                self._dirty_config_ids.add(config.audit_id)
             self._save_configurations()
             
             self.logger.info(f"Created audit configuration: {config.audit_id}")
@@ -124,8 +234,8 @@ class AuditManager:
             raise
     
     def start_audit(self, config: AuditConfiguration, 
-                   policies_source: str = "dashboard") -> str:
-        """Start a new audit run"""
+                   policies_source: str = "dashboard", use_cache: bool = True) -> str:
+        """Start a new audit run; use_cache=False re-audits policies that have cached results"""
         try:
             # Get policies from the specified source
             policies = self._get_policies_for_audit(policies_source, config)
@@ -134,7 +244,7 @@ class AuditManager:
                 raise ValueError("No policies available for audit")
             
             # Start the audit
-            audit_id = self.audit_engine.start_audit(config, policies)
+            audit_id = self.audit_engine.start_audit(config, policies, use_cache)
             
             self.logger.info(f"Started audit {audit_id} with {len(policies)} policies")
             return audit_id
@@ -236,12 +346,21 @@ class AuditManager:
         """Get current status of an audit run"""
         return self.audit_engine.get_audit_status(audit_id)
     
+    def get_audit_run(self, audit_id: str) -> Optional[AuditRun]:
+        """Get an audit run together with its policy results"""
+        return self.audit_engine.get_audit_run(audit_id)
+    
+    def await_audit(self, audit_id: str, timeout: Optional[float] = None) -> Optional[AuditRun]:
+        """Wait for an audit run to finish and return it"""
+        return self.audit_engine.await_audit(audit_id, timeout)
+    
     def cancel_audit(self, audit_id: str) -> bool:
         """Cancel a running audit"""
         return self.audit_engine.cancel_audit(audit_id)
     
     def delete_audit(self, audit_id: str) -> bool:
         """Delete audit results and associated data"""
+        self._search_entry_cache.pop(audit_id)
         return self.audit_engine.delete_audit_results(audit_id)
     
     def generate_report(self, audit_id: str, format: ReportFormat = ReportFormat.HTML,
@@ -249,11 +368,11 @@ class AuditManager:
         """Generate a report for completed audit"""
         try:
             # Get audit run
-            audit_run = self.get_audit_status(audit_id)
+            audit_run = self.get_audit_run(audit_id)
             if not audit_run:
                 raise ValueError(f"Audit {audit_id} not found")
             
-            if audit_run.status != AuditStatus.COMPLETED:
+            if audit_run.status is not AuditStatus.COMPLETED:
                 raise ValueError(f"Audit {audit_id} is not completed")
             
             # Generate report
@@ -273,26 +392,24 @@ class AuditManager:
         return self.audit_engine.get_audit_history(limit)
     
     def get_compliance_trends(self, system_id: Optional[str] = None,
-                            days: int = 30) -> Dict[str, Any]:
-        """Get compliance trends over time"""
+                            days: int = 30,
+                            history: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Get compliance trends over time, optionally from already fetched history"""
         try:
             # Calculate date range
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days)
             
             # Get audit history
-            history = self.get_audit_history(100)  # Get more data for trend analysis
+            if history is None:
+                history = self.get_audit_history(100)  # Get more data for trend analysis
             
             # Filter by date range
             filtered_history = []
             for audit_summary in history:
-                if audit_summary.get('end_time'):
-                    try:
-                        audit_date = datetime.fromisoformat(audit_summary['end_time'].replace('Z', '+00:00'))
-                        if start_date <= audit_date <= end_date:
-                            filtered_history.append(audit_summary)
-                    except:
-                        continue
+                audit_date = _parse_iso(audit_summary.get('end_time'))
+                if audit_date is not None and start_date <= audit_date <= end_date:
+                    filtered_history.append(audit_summary)
             
             # Sort by date
             filtered_history.sort(key=lambda x: x.get('end_time', ''), reverse=False)
@@ -311,8 +428,9 @@ class AuditManager:
             
             # Calculate trend direction
             if len(trend_data['compliance_scores']) >= 2:
-                recent_scores = trend_data['compliance_scores'][-3:]  # Last 3 audits
-                older_scores = trend_data['compliance_scores'][:-3] if len(trend_data['compliance_scores']) > 3 else []
+                scores = trend_data['compliance_scores']
+                recent_scores = scores[-3:]  # Last 3 audits
+                older_scores = scores[:-3]
                 
                 if older_scores:
                     recent_avg = sum(recent_scores) / len(recent_scores)
@@ -355,8 +473,10 @@ class AuditManager:
                 }
             
             # Calculate statistics
-            compliance_scores = [h.get('compliance_percentage', 0) for h in history if h.get('compliance_percentage') is not None]
+            compliance_scores = [h['compliance_percentage'] for h in history if h.get('compliance_percentage') is not None]
             total_policies = [h.get('total_policies', 0) for h in history if h.get('total_policies') is not None]
+            now = datetime.now()
+            this_month = (now.year, now.month)
             
             stats = {
                 "total_audits": len(history),
@@ -365,8 +485,8 @@ class AuditManager:
                 "worst_compliance": min(compliance_scores) if compliance_scores else 0.0,
                 "total_policies_audited": sum(total_policies),
                 "last_audit_date": history[0].get('end_time', '') if history else '',
-                "audits_this_month": len([h for h in history if self._is_this_month(h.get('end_time', ''))]),
-                "trend_direction": self.get_compliance_trends(days=30).get('trend_direction', 'unknown')
+                "audits_this_month": sum(1 for h in history if self._is_this_month(h.get('end_time', ''), this_month)),
+                "trend_direction": self.get_compliance_trends(days=30, history=history).get('trend_direction', 'unknown')
             }
             
             return stats
@@ -375,49 +495,58 @@ class AuditManager:
             self.logger.error(f"Failed to get audit statistics: {e}")
             return {"error": str(e)}
     
-    def _is_this_month(self, date_str: str) -> bool:
-        """Check if date string is in current month"""
-        try:
-            if not date_str:
-                return False
-            
-            date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            now = datetime.now()
-            
-            return date.year == now.year and date.month == now.month
-            
-        except:
+    def _is_this_month(self, date_str: str, this_month: Optional[Tuple[int, int]] = None) -> bool:
+        """Check if date string is in current month, given as a (year, month) tuple"""
+        date = _parse_iso(date_str)
+        if date is None:
             return False
+        
+        if this_month is None:
+            now = datetime.now()
+            this_month = (now.year, now.month)
+        
+        return (date.year, date.month) == this_month
     
-    def search_audit_results(self, query: str, audit_ids: Optional[List[str]] = None,
+    def search_audit_results(self, query: Union[str, List[str]], audit_ids: Optional[List[str]] = None,
                            result_types: Optional[List[ComplianceResult]] = None) -> List[Dict[str, Any]]:
-        """Search audit results across multiple audits"""
+        """Search audit results across multiple audits; a list of queries matches any of them"""
         try:
             results = []
-            
-            # Get audit IDs to search
-            search_ids = audit_ids or [h['audit_id'] for h in self.get_audit_history(50)]
+            if isinstance(query, str):
+                query_lower = query.lower()
+                matches = lambda blob: query_lower in blob
+            else:
+                terms = tuple(sorted({q.lower() for q in query if q}))
+                if not terms:
+                    return []
+                matches = _build_term_matcher(terms)
+            
+            # Get audit IDs to search; requested audits are always read, while a
+            # history-wide search reads only a bounded number of results files
+            if audit_ids:
+                search_ids, disk_loads = audit_ids, len(audit_ids)
+            else:
+                search_ids = [h['audit_id'] for h in self.get_audit_history(50)]
+                disk_loads = self.SEARCH_MAX_DISK_LOADS
             
             for audit_id in search_ids:
-                audit_run = self.get_audit_status(audit_id)
-                if not audit_run or not audit_run.policy_results:
-                    continue
+                entries = self._search_entry_cache.get(audit_id)
+                if entries is None:
+                    audit_run = self.audit_engine.get_loaded_audit_run(audit_id)
+                    if audit_run is None:
+                        if disk_loads <= 0:
+                            continue
+                        disk_loads -= 1
+                        audit_run = self.get_audit_run(audit_id)
+                    if not audit_run or not audit_run.policy_results:
+                        continue
+                    entries = self._get_search_entries(audit_run)
                 
                 # Search through policy results
-                for policy_result in audit_run.policy_results:
-                    if self._matches_search_query(policy_result, query, result_types):
-                        results.append({
-                            "audit_id": audit_id,
-                            "audit_name": audit_run.configuration.name,
-                            "audit_date": audit_run.end_time.isoformat() if audit_run.end_time else '',
-                            "policy_id": policy_result.policy_id,
-                            "policy_name": policy_result.policy_name,
-                            "category": policy_result.category,
-                            "result": policy_result.result.value,
-                            "severity": policy_result.severity.value,
-                            "error_message": policy_result.error_message,
-                            "remediation": policy_result.remediation
-                        })
+                audit_info, rows = entries
+                for blob, result, row in rows:
+                    if self._matches_search_query(result, blob, matches, result_types):
+                        results.append({**audit_info, **row})
             
             return results
             
@@ -425,36 +554,56 @@ class AuditManager:
             self.logger.error(f"Failed to search audit results: {e}")
             return []
     
-    def _matches_search_query(self, policy_result: PolicyAuditResult, query: str,
+    def _get_search_entries(self, audit_run: AuditRun) -> Tuple[Dict[str, str], List[SearchRow]]:
+        """
+        Get the audit fields of search hits and, per policy result, its
+        lower-cased searchable text, outcome and the fields a hit reports
+        """
+        audit_info = {
+            "audit_id": audit_run.audit_id,
+            "audit_name": audit_run.configuration.name,
+            "audit_date": audit_run.end_time.isoformat() if audit_run.end_time else ''
+        }
+        
+        # Fields are joined with NUL so a query cannot match across two of them
+        rows = [
+            ("\0".join(filter(None, (
+                r.policy_name, r.policy_title, r.category,
+                r.description, r.error_message, r.remediation
+            ))).lower(), r.result, {
+                "policy_id": r.policy_id,
+                "policy_name": r.policy_name,
+                "category": r.category,
+                "result": r.result.value,
+                "severity": r.severity.value,
+                "error_message": r.error_message,
+                "remediation": r.remediation
+            })
+            for r in audit_run.policy_results
+        ]
+        
+        # Results of a running audit still change, so only finished ones are kept;
+        # cached audits are searched again without reloading their results file
+        if audit_run.status is AuditStatus.COMPLETED:
+            self._search_entry_cache.set(audit_run.audit_id, (audit_info, rows))
+        return audit_info, rows
+    
+    def _matches_search_query(self, result: ComplianceResult, blob: str,
+                            matches: Callable[[str], bool],
                             result_types: Optional[List[ComplianceResult]]) -> bool:
         """Check if policy result matches search criteria"""
-        try:
-            # Filter by result type
-            if result_types and policy_result.result not in result_types:
-                return False
-            
-            # Search in text fields
-            query_lower = query.lower()
-            search_fields = [
-                policy_result.policy_name.lower(),
-                policy_result.policy_title.lower(),
-                policy_result.category.lower(),
-                (policy_result.description or '').lower(),
-                (policy_result.error_message or '').lower(),
-                (policy_result.remediation or '').lower()
-            ]
-            
-            return any(query_lower in field for field in search_fields)
-            
-        except Exception as e:
-            self.logger.warning(f"Error in search matching: {e}")
+        # Filter by result type
+        if result_types and result not in result_types:
             return False
+        
+        # Search in the prebuilt text of the policy result
+        return matches(blob)
     
     def compare_audits(self, audit_id1: str, audit_id2: str) -> Dict[str, Any]:
         """Compare results between two audit runs"""
         try:
-            audit1 = self.get_audit_status(audit_id1)
-            audit2 = self.get_audit_status(audit_id2)
+            audit1 = self.get_audit_run(audit_id1)
+            audit2 = self.get_audit_run(audit_id2)
             
             if not audit1 or not audit2:
                 raise ValueError("One or both audits not found")
@@ -463,27 +612,23 @@ class AuditManager:
             policies1 = {r.policy_id: r for r in audit1.policy_results}
             policies2 = {r.policy_id: r for r in audit2.policy_results}
             
-            # Find common policies
-            common_policies = set(policies1.keys()) & set(policies2.keys())
-            
-            # Analyze changes
+            # Analyze changes of the policies both audits share, with one
+            # lookup per policy instead of building and probing a key set
+            common_policies = 0
             improved = []
             degraded = []
             unchanged = []
+            changes = {'improved': improved, 'degraded': degraded}
             
-            for policy_id in common_policies:
-                result1 = policies1[policy_id]
-                result2 = policies2[policy_id]
+            for policy_id, result1 in policies1.items():
+                result2 = policies2.get(policy_id)
+                if result2 is None:
+                    continue
+                common_policies += 1
                 
-                if result1.result == ComplianceResult.FAIL and result2.result == ComplianceResult.PASS:
-                    improved.append({
-                        "policy_id": policy_id,
-                        "policy_name": result1.policy_name,
-                        "previous": result1.result.value,
-                        "current": result2.result.value
-                    })
-                elif result1.result == ComplianceResult.PASS and result2.result == ComplianceResult.FAIL:
-                    degraded.append({
+                change = _TRANSITIONS.get((result1.result, result2.result))
+                if change is not None:
+                    changes[change].append({
                         "policy_id": policy_id,
                         "policy_name": result1.policy_name,
                         "previous": result1.result.value,
@@ -510,7 +655,7 @@ class AuditManager:
                     "compliance": audit2.summary.compliance_percentage if audit2.summary else 0
                 },
                 "comparison": {
-                    "common_policies": len(common_policies),
+                    "common_policies": common_policies,
                     "improved_policies": len(improved),
                     "degraded_policies": len(degraded),
                     "unchanged_policies": len(unchanged),
@@ -530,55 +675,107 @@ class AuditManager:
             return {"error": str(e)}
     
     def _save_configurations(self):
-        """Save audit configurations to persistent storage"""
+        """Append changed audit configurations to persistent storage"""
         try:
-            configs_file = os.path.join(self.data_dir, "configurations.json")
-            
-            # Convert configurations to serializable format
-            config_data = {}
-            for config_id, config in self.configuration_cache.items():
-                if hasattr(config, '__dict__'):
-                    config_data[config_id] = config.__dict__
-                else:
-                    config_data[config_id] = config
-            
-            with open(configs_file, 'w') as f:
-                json.dump(config_data, f, indent=2, default=str)
+            with self._config_lock:
+                if not self._dirty_config_ids:
+                    return
+                
+                lines = []
+                for config_id in self._dirty_config_ids:
+                    config = self.configuration_cache.get(config_id)
+                    if config is not None:
+                        lines.append(dumps_json({config_id: self._serialize_configuration(config)}) + b"\n")
+                
+                with open(self._config_log_path, 'ab') as f:
+                    f.writelines(lines)
+                
+                self._dirty_config_ids.clear()
+                self._config_log_entries += len(lines)
+                if self._config_log_entries >= self.CONFIG_LOG_COMPACT_EVERY:
+                    self._compact_configurations()
             
         except Exception as e:
             self.logger.error(f"Failed to save configurations: {e}")
     
+    def _compact_configurations(self):
+        """Write every configuration to the snapshot file and start a fresh log; call with _config_lock held"""
+        # Convert configurations to serializable format
+        config_data = {
+            config_id: self._serialize_configuration(config)
+            for config_id, config in self.configuration_cache.items()
+        }
+        
+        # The snapshot lands before the log goes, so a crash in between only replays entries twice
+        with atomic_write(self._configs_path) as f:
+            dump_json(config_data, f, indent=True)
+        
+        try:
+            os.remove(self._config_log_path)
+        except FileNotFoundError:
+            pass
+        self._config_log_entries = 0
+    
+    def _replay_configuration_log(self):
+        """Apply configuration changes appended after the last snapshot"""
+        try:
+            data = read_bytes(self._config_log_path)
+        except FileNotFoundError:
+            return
+        
+        if data and not data.endswith(b"\n"):
+            # A save interrupted mid-line leaves a torn final entry; cut it off
+            # so the next append starts on a line of its own
+            self.logger.warning("Discarding torn configuration log entry")
+            data = data[:data.rfind(b"\n") + 1]
+            os.truncate(self._config_log_path, len(data))
+        
+        for line in data.splitlines():
+            if not line:
+                continue
+            try:
+                self.configuration_cache.update(loads_json(line))
+                self._config_log_entries += 1
+            except ValueError:
+                self.logger.warning("Skipping unreadable configuration log entry")
+    
+    @staticmethod
+    def _serialize_configuration(config: Any) -> Any:
+        """Plain data for a configuration object or an already loaded raw entry"""
+        if isinstance(config, AuditConfiguration):
+            # Fields only, so private caches such as the content hash are never persisted
+            return serialize_audit_configuration(config)
+        return config.__dict__ if hasattr(config, '__dict__') else config
+    
     def get_remediation_summary(self, audit_id: str) -> Dict[str, Any]:
         """Get summary of remediation actions needed"""
         try:
-            audit_run = self.get_audit_status(audit_id)
+            audit_run = self.get_audit_run(audit_id)
             if not audit_run:
                 raise ValueError(f"Audit {audit_id} not found")
             
-            # Get failed policies with remediation
-            failed_with_remediation = [
-                r for r in audit_run.policy_results 
-                if r.result == ComplianceResult.FAIL and r.remediation
-            ]
-            
-            # Group by category and severity
-            by_category = {}
-            by_severity = {}
+            # Count failures and group those with remediation by category and
+            # severity in a single pass over the results
+            by_category = defaultdict(list)
+            by_severity = defaultdict(list)
+            total_failed = 0
+            with_remediation = 0
+            fail = ComplianceResult.FAIL
             
-            for result in failed_with_remediation:
-                # By category
-                if result.category not in by_category:
-                    by_category[result.category] = []
+            for result in audit_run.policy_results:
+                if result.result is not fail:
+                    continue
+                total_failed += 1
+                if not result.remediation:
+                    continue
+                with_remediation += 1
+                
+                severity = result.severity.value
                 by_category[result.category].append({
                     "policy_name": result.policy_name,
-                    "severity": result.severity.value,
+                    "severity": severity,
                     "remediation": result.remediation
                 })
-                
-                # By severity
-                severity = result.severity.value
-                if severity not in by_severity:
-                    by_severity[severity] = []
                 by_severity[severity].append({
                     "policy_name": result.policy_name,
                     "category": result.category,
@@ -587,10 +784,10 @@ class AuditManager:
             
             summary = {
                 "audit_id": audit_id,
-                "total_failed_policies": len([r for r in audit_run.policy_results if r.result == ComplianceResult.FAIL]),
-                "policies_with_remediation": len(failed_with_remediation),
-                "by_category": by_category,
-                "by_severity": by_severity,
+                "total_failed_policies": total_failed,
+                "policies_with_remediation": with_remediation,
+                "by_category": dict(by_category),
+                "by_severity": dict(by_severity),
                 "priority_actions": by_severity.get('critical', [])[:5] + by_severity.get('high', [])[:5]  # Top priority items
             }
             
@@ -606,23 +803,24 @@ class AuditManager:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             export_file = os.path.join(self.data_dir, f"audit_export_{timestamp}.json")
             
-            export_data = {
-                "export_timestamp": datetime.now().isoformat(),
-                "export_version": "1.0",
-                "configurations": self.configuration_cache,
-                "audits": []
-            }
-            
             # Export specific audits or all recent ones
             ids_to_export = audit_ids or [h['audit_id'] for h in self.get_audit_history(20)]
             
-            for audit_id in ids_to_export:
-                audit_run = self.get_audit_status(audit_id)
-                if audit_run:
-                    export_data["audits"].append(serialize_audit_run(audit_run))
-            
-            with open(export_file, 'w') as f:
-                json.dump(export_data, f, indent=2, default=str)
+            # Audits are encoded and written one at a time so only a single
+            # run is ever held in memory as JSON, while the next few load
+            with atomic_write(export_file, False) as f:
+                f.write(b'{"export_timestamp": ' + dumps_json(datetime.now().isoformat()))
+                f.write(b', "export_version": "1.0"')
+                f.write(b', "configurations": ' + dumps_json(self.configuration_cache))
+                f.write(b', "audits": [')
+                
+                separator = b"\n"
+                for audit_run in self._iter_audit_runs(ids_to_export):
+                    if audit_run:
+                        f.write(separator + dumps_json(audit_run))
+                        separator = b",\n"
+                
+                f.write(b"\n]}\n")
             
             self.logger.info(f"Exported audit data to {export_file}")
             return export_file
@@ -631,6 +829,19 @@ class AuditManager:
             self.logger.error(f"Failed to export audit data: {e}")
             raise
     
+    def _iter_audit_runs(self, audit_ids: List[str]) -> Iterator[Optional[AuditRun]]:
+        """Load audit runs in order, reading a bounded number ahead on worker threads"""
+        with ThreadPoolExecutor(max_workers=self.EXPORT_READ_AHEAD,
+                                thread_name_prefix="audit-export") as executor:
+            pending = deque()
+            for audit_id in audit_ids:
+                pending.append(executor.submit(self.get_audit_run, audit_id))
+                if len(pending) > self.EXPORT_READ_AHEAD:
+                    yield pending.popleft().result()
+            
+            while pending:
+                yield pending.popleft().result()
+    
     def cleanup_old_audits(self, days_to_keep: int = 90) -> int:
         """Clean up old audit results to save storage space"""
         try:
@@ -639,14 +850,10 @@ class AuditManager:
             
             deleted_count = 0
             for audit_summary in history:
-                if audit_summary.get('end_time'):
-                    try:
-                        audit_date = datetime.fromisoformat(audit_summary['end_time'].replace('Z', '+00:00'))
-                        if audit_date < cutoff_date:
-                            if self.delete_audit(audit_summary['audit_id']):
-                                deleted_count += 1
-                    except:
-                        continue
+                audit_date = _parse_iso(audit_summary.get('end_time'))
+                if audit_date is not None and audit_date < cutoff_date:
+                    if self.delete_audit(audit_summary['audit_id']):
+                        deleted_count += 1
             
             self.logger.info(f"Cleaned up {deleted_count} old audit results")
             return deleted_count
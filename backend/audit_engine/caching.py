@@ -0,0 +1,66 @@
+"""
+Audit Caching Utilities - Step 6
+Thread-safe in-memory caches shared by the audit engine components.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+# =================================================================
+# TTL + LRU CACHE
+# =================================================================
+
+class TTLCache:
+    """
+    Least-recently-used cache whose entries also expire a fixed number of
+    seconds after they were stored. A `ttl` of None disables expiry.
+    """
+    
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 300):
+        """Create an empty cache holding at most `maxsize` entries"""
+        self.maxsize = maxsize
+        self.ttl = float("inf") if ttl is None else ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return a live entry and mark it as recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any):
+        """Store an entry, evicting the least recently used one if full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Remove an entry and return its value"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return default if entry is None else entry[1]
+    
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        """Number of stored entries, including expired ones not yet evicted"""
+        with self._lock:
+            return len(self._entries)
@@ -3,13 +3,97 @@ Audit Engine Data Models - Step 6
 Comprehensive data structures for audit operations, results, and reporting.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields, is_dataclass
 from datetime import datetime
 from enum import Enum
-from typing import List, Dict, Optional, Any, Union
+from typing import List, Dict, Optional, Any, Union, BinaryIO, Callable, Tuple, get_args
 import json
-import hashlib
-import uuid
+import sys
+from collections import defaultdict
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import ujson
+    HAS_UJSON = True
+except ImportError:
+    HAS_UJSON = False
+
+def _slotted(cls):
+    """
+    Rebuild a dataclass with __slots__ for its fields, as dataclass(slots=True)
+    does on Python 3.10+. Instances then carry no per-object __dict__.
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = dict(cls.__dict__)
+    namespace['__slots__'] = names
+    for name in names:
+        # Defaults already live in the generated __init__
+        namespace.pop(name, None)
+    namespace.pop('__dict__', None)
+    namespace.pop('__weakref__', None)
+    
+    slotted = type(cls)(cls.__name__, cls.__bases__, namespace)
+    slotted.__qualname__ = cls.__qualname__
+    return slotted
+
+# Field names per dataclass, resolved once for _field_dict
+_FIELD_NAMES: Dict[type, Tuple[str, ...]] = {}
+
+def _field_names(cls: type) -> Tuple[str, ...]:
+    """Field names of a dataclass type, looked up once per type"""
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        names = _FIELD_NAMES[cls] = tuple(f.name for f in fields(cls))
+    return names
+
+def _field_dict(obj: Any) -> Dict[str, Any]:
+    """Shallow field-name to value dictionary of a dataclass instance, slotted or not"""
+    return {name: getattr(obj, name) for name in _field_names(type(obj))}
+
+# Canonical encoding hashed into AuditRun.config_hash and results_hash
+def _hash_default(value: Any) -> Any:
+    """Normalise values JSON lacks a type for, identically for both hash encoders"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if is_dataclass(value):
+        return _field_dict(value)
+    return str(value)
+
+_HASH_ENCODER = json.JSONEncoder(
+    default=_hash_default, sort_keys=True, ensure_ascii=False, separators=(',', ':')
+)
+
+def _hash_payload(obj: Any) -> bytes:
+    """
+    Canonical sorted-key JSON bytes of a model, encoded by orjson when available.
+    Both encoders produce the same bytes, so hashes do not depend on which one is installed.
+    """
+    if HAS_ORJSON:
+        # Dataclasses and datetimes go through _hash_default too: orjson would
+        # keep dataclass fields in declaration order and format datetimes itself
+        return orjson.dumps(
+            _field_dict(obj), default=_hash_default,
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+    return _HASH_ENCODER.encode(_field_dict(obj)).encode()
+
+def _intern(value: Any) -> Any:
+    """Intern plain strings; other values (None, str subclasses) pass through"""
+    return sys.intern(value) if type(value) is str else value
+
+def _new_id() -> str:
+    """Generate a unique, URL- and filename-safe identifier for a new model instance"""
+    # Only needed once an object is created, not to import the models
+    import secrets
+    return secrets.token_urlsafe(16)
 
 # =================================================================
 # ENUMS FOR AUDIT SYSTEM
@@ -71,10 +155,15 @@ class AuditMethod(Enum):
     GROUP_POLICY = "group_policy"
     FILE_SYSTEM = "file_system"
 
+# Small integer codes for enum members, used to tally and to store result columns
+RESULT_CODES = {member: code for code, member in enumerate(ComplianceResult)}
+SEVERITY_CODES = {member: code for code, member in enumerate(AuditSeverity)}
+
 # =================================================================
 # CORE DATA STRUCTURES
 # =================================================================
 
+@_slotted
 @dataclass
 class SystemInfo:
     """Target system information"""
@@ -89,8 +178,13 @@ class SystemInfo:
     total_memory: Optional[int] = None
     cpu_info: Optional[str] = None
     scan_timestamp: datetime = field(default_factory=datetime.now)
-    system_hash: str = field(default_factory=lambda: str(uuid.uuid4()))
+    system_hash: str = field(default_factory=_new_id)
+    
+    def to_json_dict(self) -> Dict[str, Any]:
+        """Plain dictionary with datetimes already in ISO format"""
+        return _serialize_system_info_fields(self)
 
+@_slotted
 @dataclass
 class PolicyAuditResult:
     """Result of auditing a single policy"""
@@ -124,31 +218,39 @@ class PolicyAuditResult:
     group_name: Optional[str] = None
     tags: List[str] = field(default_factory=list)
     related_policies: List[str] = field(default_factory=list)
+    
+    def __post_init__(self):
+        """Share one string object per distinct id, category and group across results"""
+        self.policy_id = _intern(self.policy_id)
+        self.category = _intern(self.category)
+        self.group_name = _intern(self.group_name)
 
-@dataclass
+@dataclass(frozen=True)
 class AuditConfiguration:
-    """Configuration for audit operations"""
-    audit_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    """Configuration for audit operations; frozen so its content hash never goes stale"""
+    audit_id: str = field(default_factory=_new_id)
     name: str = "CIS Audit Scan"
     description: str = "Automated CIS benchmark compliance audit"
     
     # Scope Configuration
     scope: AuditScope = AuditScope.FULL_SYSTEM
-    policy_ids: List[str] = field(default_factory=list)
-    group_names: List[str] = field(default_factory=list)
-    cis_levels: List[int] = field(default_factory=lambda: [1, 2])
-    categories: List[str] = field(default_factory=list)
+    policy_ids: Tuple[str, ...] = ()
+    group_names: Tuple[str, ...] = ()
+    cis_levels: Tuple[int, ...] = (1, 2)
+    categories: Tuple[str, ...] = ()
     
     # Execution Configuration
     parallel_execution: bool = True
     max_workers: int = 10
+    use_processes: bool = False
+    batch_size: int = 64
     timeout_seconds: int = 300
     retry_failed: bool = True
     max_retries: int = 3
     
     # Output Configuration
     generate_report: bool = True
-    report_formats: List[ReportFormat] = field(default_factory=lambda: [ReportFormat.HTML, ReportFormat.CSV])
+    report_formats: Tuple[ReportFormat, ...] = (ReportFormat.HTML, ReportFormat.CSV)
     include_passed: bool = True
     include_failed: bool = True
     include_errors: bool = True
@@ -160,7 +262,31 @@ class AuditConfiguration:
     
     created_at: datetime = field(default_factory=datetime.now)
     created_by: str = "audit_engine"
+    
+    def __post_init__(self):
+        """Store the list fields as tuples so the configuration cannot change in place"""
+        for name in _CONFIGURATION_SEQUENCE_FIELDS:
+            value = getattr(self, name)
+            if not isinstance(value, tuple):
+                object.__setattr__(self, name, tuple(value))
+    
+    @property
+    def content_hash(self) -> str:
+        """Short digest of the configuration, computed once and shared by every run using it"""
+        cached = self.__dict__.get('_content_hash')
+        if cached is None:
+            import hashlib
+            # Underscore attributes are left out of the hashed payload, so the cache never hashes itself
+            cached = self.__dict__['_content_hash'] = hashlib.sha256(_hash_payload(self)).hexdigest()[:16]
+        return cached
+    
+    def __hash__(self) -> int:
+        """Hash by content, reusing the cached digest instead of hashing every field"""
+        return hash(self.content_hash)
 
+_CONFIGURATION_SEQUENCE_FIELDS = ('policy_ids', 'group_names', 'cis_levels', 'categories', 'report_formats')
+
+@_slotted
 @dataclass
 class AuditSummary:
     """Summary statistics for audit results"""
@@ -190,6 +316,15 @@ class AuditSummary:
     # Compliance Scoring
     compliance_percentage: float = 0.0
     security_score: float = 0.0
+    
+    def to_json_dict(self) -> Dict[str, Any]:
+        """Plain dictionary whose keys are all strings, as JSON stores them"""
+        check_audit_summary(self)
+        summary_dict = _field_dict(self)
+        summary_dict['level_breakdown'] = {
+            str(level): counts for level, counts in self.level_breakdown.items()
+        }
+        return summary_dict
 
 @dataclass
 class AuditRun:
@@ -227,12 +362,26 @@ class AuditRun:
     
     def __post_init__(self):
         """Calculate configuration and results hashes"""
-        config_str = json.dumps(self.configuration.__dict__, default=str, sort_keys=True)
-        self.config_hash = hashlib.sha256(config_str.encode()).hexdigest()[:16]
+        self.update_hashes()
+    
+    def update_hashes(self):
+        """Recalculate both hashes from the current configuration and policy results"""
+        # Imported here so loading the models alone does not initialize OpenSSL
+        import hashlib
         
-        results_str = json.dumps([r.__dict__ for r in self.policy_results], default=str, sort_keys=True)
-        self.results_hash = hashlib.sha256(results_str.encode()).hexdigest()[:16]
+        self.config_hash = self.configuration.content_hash
+        
+        # Results are fed to the hash one at a time, producing the same bytes
+        # as encoding the whole list without ever holding that string
+        digest = hashlib.sha256(b"[")
+        for index, result in enumerate(self.policy_results):
+            if index:
+                digest.update(b",")
+            digest.update(_hash_payload(result))
+        digest.update(b"]")
+        self.results_hash = digest.hexdigest()[:16]
 
+@_slotted
 @dataclass
 class RemediationSuggestion:
     """Suggested remediation for failed policies"""
@@ -257,10 +406,11 @@ class RemediationSuggestion:
     microsoft_docs: Optional[str] = None
     additional_resources: List[str] = field(default_factory=list)
 
+@_slotted
 @dataclass
 class AuditTrend:
     """Historical trending data for audits"""
-    trend_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    trend_id: str = field(default_factory=_new_id)
     system_id: str = ""
     
     # Time Series Data
@@ -279,10 +429,11 @@ class AuditTrend:
     
     last_updated: datetime = field(default_factory=datetime.now)
 
+@_slotted
 @dataclass
 class ReportTemplate:
     """Template configuration for report generation"""
-    template_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    template_id: str = field(default_factory=_new_id)
     name: str = "Standard CIS Audit Report"
     description: str = "Comprehensive CIS benchmark compliance report"
     
@@ -311,93 +462,284 @@ class ReportTemplate:
 # SERIALIZATION FUNCTIONS
 # =================================================================
 
+def _make_serializer(cls) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Generate a function that converts one dataclass instance to a plain dict.
+    Field kinds are resolved once here, so each call is a single dict display
+    with enums replaced by their values and datetimes by ISO strings.
+    """
+    items = []
+    for f in fields(cls):
+        types = get_args(f.type) or (f.type,)
+        getter = f"o.{f.name}"
+        if any(isinstance(t, type) and issubclass(t, Enum) for t in types):
+            expression = f"{getter}.value if {getter} is not None else None"
+        elif datetime in types:
+            expression = f"{getter}.isoformat() if {getter} else {getter}"
+        else:
+            expression = getter
+        items.append(f"{f.name!r}: {expression}")
+    
+    source = f"def serialize(o):\n    return {{{', '.join(items)}}}\n"
+    namespace = {}
+    exec(source, namespace)
+    return namespace["serialize"]
+
 def serialize_audit_run(audit_run: AuditRun) -> Dict[str, Any]:
     """Convert AuditRun to JSON-serializable dictionary"""
-    def convert_value(obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        elif isinstance(obj, Enum):
-            return obj.value
-        elif hasattr(obj, '__dict__'):
-            return {k: convert_value(v) for k, v in obj.__dict__.items()}
-        elif isinstance(obj, list):
-            return [convert_value(item) for item in obj]
-        elif isinstance(obj, dict):
-            return {k: convert_value(v) for k, v in obj.items()}
-        return obj
-    
-    return convert_value(audit_run)
+    if HAS_ORJSON:
+        # orjson walks the dataclasses, enums and datetimes in C; decoding the
+        # bytes is still far cheaper than the Python-level walk below
+        return orjson.loads(dumps_json(audit_run))
+    
+    return _convert_value(audit_run)
+
+def _identity(obj: Any) -> Any:
+    """Return values that are already JSON-compatible unchanged"""
+    return obj
+
+def _enum_value(obj: Enum) -> Any:
+    """Plain value of an enum member"""
+    return obj.value
+
+def _convert_dataclass(obj: Any) -> Dict[str, Any]:
+    """Convert each field of a dataclass instance, slotted or not"""
+    return {name: _convert_value(getattr(obj, name)) for name in _field_names(type(obj))}
+
+def _convert_object(obj: Any) -> Dict[str, Any]:
+    """Convert each attribute of a plain object"""
+    return {k: _convert_value(v) for k, v in obj.__dict__.items()}
+
+def _convert_list(obj: Union[list, tuple]) -> List[Any]:
+    """Convert each item of a list or tuple"""
+    return [_convert_value(item) for item in obj]
+
+def _convert_dict(obj: dict) -> Dict[Any, Any]:
+    """Convert each value of a dictionary"""
+    return {k: _convert_value(v) for k, v in obj.items()}
+
+# Converter for each concrete type seen so far; a new type is classified
+# once by _converter_for and then dispatched with a single lookup
+_CONVERTERS: Dict[type, Callable[[Any], Any]] = {
+    str: _identity, int: _identity, float: _identity, bool: _identity, type(None): _identity,
+    datetime: datetime.isoformat, list: _convert_list, tuple: _convert_list, dict: _convert_dict,
+}
+
+def _converter_for(obj: Any) -> Callable[[Any], Any]:
+    """Choose and remember the converter for the type of an object"""
+    if isinstance(obj, datetime):
+        converter = type(obj).isoformat
+    elif isinstance(obj, Enum):
+        converter = _enum_value
+    elif is_dataclass(obj):
+        converter = _convert_dataclass
+    elif hasattr(obj, '__dict__'):
+        converter = _convert_object
+    elif isinstance(obj, list):
+        converter = _convert_list
+    elif isinstance(obj, dict):
+        converter = _convert_dict
+    else:
+        converter = _identity
+    
+    _CONVERTERS[type(obj)] = converter
+    return converter
+
+def _convert_value(obj: Any) -> Any:
+    """Convert models, enums and datetimes to plain JSON-compatible data"""
+    converter = _CONVERTERS.get(type(obj))
+    if converter is None:
+        converter = _converter_for(obj)
+    return converter(obj)
 
 def serialize_policy_result(policy_result: PolicyAuditResult) -> Dict[str, Any]:
     """Convert PolicyAuditResult to JSON-serializable dictionary"""
-    result_dict = policy_result.__dict__.copy()
-    
-    # Convert enums to values
-    result_dict['result'] = policy_result.result.value
-    result_dict['severity'] = policy_result.severity.value
-    result_dict['audit_method'] = policy_result.audit_method.value
-    
-    # Convert datetime to string
-    if result_dict['audit_timestamp']:
-        result_dict['audit_timestamp'] = policy_result.audit_timestamp.isoformat()
-    
-    return result_dict
+    return _serialize_policy_result_fields(policy_result)
+
+# Specialized per-class converters, generated once at import time
+_serialize_policy_result_fields = _make_serializer(PolicyAuditResult)
+_serialize_system_info_fields = _make_serializer(SystemInfo)
 
 def serialize_system_info(system_info: SystemInfo) -> Dict[str, Any]:
     """Convert SystemInfo to JSON-serializable dictionary"""
-    info_dict = system_info.__dict__.copy()
+    return system_info.to_json_dict()
+
+def deserialize_system_info(data: Dict[str, Any]) -> SystemInfo:
+    """Convert dictionary back to SystemInfo object"""
+    info_dict = data.copy()
     
     # Convert datetime fields
     datetime_fields = ['install_date', 'last_boot', 'scan_timestamp']
     for field in datetime_fields:
         if info_dict.get(field):
-            info_dict[field] = info_dict[field].isoformat()
+            info_dict[field] = datetime.fromisoformat(info_dict[field])
     
-    return info_dict
+    return SystemInfo(**info_dict)
+
+def _json_default(obj: Any) -> Any:
+    """Fallback conversion for values the JSON encoder cannot handle itself"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    elif isinstance(obj, Enum):
+        return obj.value
+    elif is_dataclass(obj):
+        return _field_dict(obj)
+    elif hasattr(obj, '__dict__'):
+        return obj.__dict__
+    return str(obj)
+
+def dumps_json(obj: Any, indent: bool = False) -> bytes:
+    """Encode audit models or plain data as UTF-8 JSON, preferring orjson"""
+    if HAS_ORJSON:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=_json_default, option=option)
+    
+    return json.dumps(obj, indent=2 if indent else None, default=_json_default).encode('utf-8')
+
+def dump_json(obj: Any, fp: BinaryIO, indent: bool = False):
+    """Write JSON to a binary file without building an intermediate string in Python"""
+    if HAS_ORJSON:
+        fp.write(dumps_json(obj, indent))
+        return
+    
+    # The stdlib encoder is streamed chunk by chunk so large runs stay small in memory
+    encoder = json.JSONEncoder(indent=2 if indent else None, default=_json_default)
+    for chunk in encoder.iterencode(obj):
+        fp.write(chunk.encode('utf-8'))
+
+def loads_json(data: Union[bytes, str]) -> Any:
+    """Decode JSON produced by dumps_json or any other encoder"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    elif HAS_UJSON:
+        return ujson.loads(data)
+    return json.loads(data)
 
 def serialize_audit_summary(summary: AuditSummary) -> Dict[str, Any]:
     """Convert AuditSummary to JSON-serializable dictionary"""
-    return summary.__dict__.copy()
+    check_audit_summary(summary)
+    return _field_dict(summary)
+
+def _init_kwargs(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the keys that are constructor fields of a dataclass"""
+    names = {f.name for f in fields(cls) if f.init}
+    return {k: v for k, v in data.items() if k in names}
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO timestamp written by the serializers, tolerating None"""
+    return datetime.fromisoformat(value) if value else None
+
+def deserialize_policy_result(data: Dict[str, Any]) -> PolicyAuditResult:
+    """Convert dictionary back to PolicyAuditResult object"""
+    result_dict = _init_kwargs(PolicyAuditResult, data)
+    
+    result_dict['result'] = ComplianceResult(result_dict['result'])
+    result_dict['severity'] = AuditSeverity(result_dict['severity'])
+    if 'audit_method' in result_dict:
+        result_dict['audit_method'] = AuditMethod(result_dict['audit_method'])
+    if 'audit_timestamp' in result_dict:
+        result_dict['audit_timestamp'] = _parse_datetime(result_dict['audit_timestamp'])
+    
+    return PolicyAuditResult(**result_dict)
+
+def serialize_audit_configuration(config: AuditConfiguration) -> Dict[str, Any]:
+    """Shallow field mapping of an AuditConfiguration; the JSON encoder handles nested values"""
+    return _field_dict(config)
+
+def deserialize_audit_configuration(data: Dict[str, Any]) -> AuditConfiguration:
+    """Convert dictionary back to AuditConfiguration object"""
+    config_dict = _init_kwargs(AuditConfiguration, data)
+    
+    if 'scope' in config_dict:
+        config_dict['scope'] = AuditScope(config_dict['scope'])
+    if 'report_formats' in config_dict:
+        config_dict['report_formats'] = [ReportFormat(f) for f in config_dict['report_formats']]
+    if 'created_at' in config_dict:
+        config_dict['created_at'] = _parse_datetime(config_dict['created_at'])
+    
+    return AuditConfiguration(**config_dict)
+
+def deserialize_audit_summary(data: Dict[str, Any]) -> AuditSummary:
+    """Convert dictionary back to AuditSummary object"""
+    summary_dict = _init_kwargs(AuditSummary, data)
+    
+    # JSON stores the CIS level keys as strings
+    if 'level_breakdown' in summary_dict:
+        summary_dict['level_breakdown'] = {
+            int(level): counts for level, counts in summary_dict['level_breakdown'].items()
+        }
+    
+    return AuditSummary(**summary_dict)
 
 def deserialize_audit_run(data: Dict[str, Any]) -> AuditRun:
     """Convert dictionary back to AuditRun object"""
-    # This would implement the reverse conversion
-    # For now, returning a placeholder implementation
-    pass
+    run_dict = _init_kwargs(AuditRun, data)
+    
+    run_dict['configuration'] = deserialize_audit_configuration(run_dict['configuration'])
+    run_dict['system_info'] = deserialize_system_info(_init_kwargs(SystemInfo, run_dict['system_info']))
+    if 'status' in run_dict:
+        run_dict['status'] = AuditStatus(run_dict['status'])
+    for name in ('start_time', 'end_time'):
+        if name in run_dict:
+            run_dict[name] = _parse_datetime(run_dict[name])
+    if 'policy_results' in run_dict:
+        run_dict['policy_results'] = [deserialize_policy_result(r) for r in run_dict['policy_results']]
+    if run_dict.get('summary'):
+        run_dict['summary'] = deserialize_audit_summary(run_dict['summary'])
+    
+    audit_run = AuditRun(**run_dict)
+    
+    # Contents that no longer produce the recorded hashes were altered or corrupted on disk
+    recorded = (data.get('config_hash'), data.get('results_hash'))
+    if all(recorded) and recorded != (audit_run.config_hash, audit_run.results_hash):
+        raise ValueError(f"Audit run {audit_run.audit_id} does not match its recorded integrity hashes")
+    
+    return audit_run
 
 # =================================================================
 # VALIDATION FUNCTIONS
 # =================================================================
 
+# Configuration errors, one per bit of audit_configuration_error_mask
+_CONFIGURATION_ERRORS = (
+    "Audit name cannot be empty",
+    "Policy IDs must be specified for selected policies scope",
+    "Group names must be specified for policy group scope",
+    "Timeout must be at least 10 seconds",
+    "Max workers must be between 1 and 50",
+    "Batch size must be at least 1",
+)
+
+def audit_configuration_error_mask(config: AuditConfiguration) -> int:
+    """Bit i is set when check i of _CONFIGURATION_ERRORS fails; 0 means valid"""
+    name = config.name
+    scope = config.scope
+    return (
+        (not name or name.isspace())
+        | (scope is AuditScope.SELECTED_POLICIES and not config.policy_ids) << 1
+        | (scope is AuditScope.POLICY_GROUP and not config.group_names) << 2
+        | (config.timeout_seconds < 10) << 3
+        | (not 1 <= config.max_workers <= 50) << 4
+        | (config.batch_size < 1) << 5
+    )
+
 def validate_audit_configuration(config: AuditConfiguration) -> List[str]:
     """Validate audit configuration and return list of errors"""
-    errors = []
-    
-    if not config.name.strip():
-        errors.append("Audit name cannot be empty")
-    
-    if config.scope == AuditScope.SELECTED_POLICIES and not config.policy_ids:
-        errors.append("Policy IDs must be specified for selected policies scope")
-    
-    if config.scope == AuditScope.POLICY_GROUP and not config.group_names:
-        errors.append("Group names must be specified for policy group scope")
+    mask = audit_configuration_error_mask(config)
+    if not mask:
+        return []
     
-    if config.timeout_seconds < 10:
-        errors.append("Timeout must be at least 10 seconds")
-    
-    if config.max_workers < 1 or config.max_workers > 50:
-        errors.append("Max workers must be between 1 and 50")
-    
-    return errors
+    # Messages are only looked up for configurations that fail a check
+    return [message for bit, message in enumerate(_CONFIGURATION_ERRORS) if mask >> bit & 1]
 
 def validate_policy_audit_result(result: PolicyAuditResult) -> List[str]:
     """Validate policy audit result and return list of errors"""
     errors = []
     
-    if not result.policy_id.strip():
+    if not result.policy_id or result.policy_id.isspace():
         errors.append("Policy ID cannot be empty")
     
-    if not result.policy_name.strip():
+    if not result.policy_name or result.policy_name.isspace():
         errors.append("Policy name cannot be empty")
     
     if result.cis_level < 1 or result.cis_level > 3:
@@ -408,41 +750,74 @@ def validate_policy_audit_result(result: PolicyAuditResult) -> List[str]:
     
     return errors
 
+def validate_audit_summary(summary: AuditSummary) -> List[str]:
+    """Check that a summary's outcome counts add up and its stored percentage matches them"""
+    errors = []
+    
+    counted = (summary.passed_policies + summary.failed_policies + summary.error_policies
+               + summary.not_applicable_policies + summary.manual_review_policies)
+    if counted != summary.total_policies:
+        errors.append(f"Outcome counts add up to {counted}, not {summary.total_policies} policies")
+    
+    # Older files stored the unrounded value, so agreement to the stored precision is enough
+    expected = summary.passed_policies / summary.total_policies * 100.0 if summary.total_policies else 0.0
+    if abs(summary.compliance_percentage - expected) > 10 ** -COMPLIANCE_PERCENTAGE_DIGITS:
+        errors.append(f"Compliance percentage {summary.compliance_percentage} does not match the pass count")
+    
+    return errors
+
+def check_audit_summary(summary: AuditSummary):
+    """Raise ValueError before an inconsistent summary is serialized"""
+    errors = validate_audit_summary(summary)
+    if errors:
+        raise ValueError(f"Invalid audit summary: {'; '.join(errors)}")
+
 # =================================================================
 # UTILITY FUNCTIONS
 # =================================================================
 
+# Decimal places kept for the stored compliance percentage
+COMPLIANCE_PERCENTAGE_DIGITS = 2
+
+_PASS_CODE = RESULT_CODES[ComplianceResult.PASS]
+_FAIL_CODE = RESULT_CODES[ComplianceResult.FAIL]
+_ERROR_CODE = RESULT_CODES[ComplianceResult.ERROR]
+
 def calculate_compliance_score(results: List[PolicyAuditResult]) -> float:
     """Calculate overall compliance score from audit results"""
     if not results:
         return 0.0
     
     total_policies = len(results)
-    passed_policies = sum(1 for r in results if r.result == ComplianceResult.PASS)
+    passed_policies = sum(1 for r in results if r.result is ComplianceResult.PASS)
     
     return (passed_policies / total_policies) * 100.0
 
-def calculate_security_score(results: List[PolicyAuditResult]) -> float:
-    """Calculate weighted security score based on severity"""
-    if not results:
-        return 0.0
-    
-    severity_weights = {
+# Weight of each severity in the security score, indexed by SEVERITY_CODES
+_SEVERITY_WEIGHTS = tuple(
+    {
         AuditSeverity.CRITICAL: 10,
         AuditSeverity.HIGH: 8,
         AuditSeverity.MEDIUM: 5,
         AuditSeverity.LOW: 2,
         AuditSeverity.INFORMATIONAL: 1
-    }
+    }[member]
+    for member in AuditSeverity
+)
+
+def calculate_security_score(results: List[PolicyAuditResult]) -> float:
+    """Calculate weighted security score based on severity"""
+    if not results:
+        return 0.0
     
     total_weight = 0
     passed_weight = 0
     
     for result in results:
-        weight = severity_weights.get(result.severity, 1)
+        weight = _SEVERITY_WEIGHTS[SEVERITY_CODES[result.severity]]
         total_weight += weight
         
-        if result.result == ComplianceResult.PASS:
+        if result.result is ComplianceResult.PASS:
             passed_weight += weight
     
     if total_weight == 0:
@@ -450,47 +825,72 @@ def calculate_security_score(results: List[PolicyAuditResult]) -> float:
     
     return (passed_weight / total_weight) * 100.0
 
+def _category_counts() -> List[int]:
+    """Per-category tally with one slot per result code"""
+    return [0] * len(RESULT_CODES)
+
 def generate_audit_summary(results: List[PolicyAuditResult]) -> AuditSummary:
-    """Generate comprehensive summary from audit results"""
+    """Generate comprehensive summary from audit results in a single pass"""
     summary = AuditSummary()
     
-    # Basic counts
-    summary.total_policies = len(results)
-    summary.passed_policies = sum(1 for r in results if r.result == ComplianceResult.PASS)
-    summary.failed_policies = sum(1 for r in results if r.result == ComplianceResult.FAIL)
-    summary.error_policies = sum(1 for r in results if r.result == ComplianceResult.ERROR)
-    summary.not_applicable_policies = sum(1 for r in results if r.result == ComplianceResult.NOT_APPLICABLE)
-    summary.manual_review_policies = sum(1 for r in results if r.result == ComplianceResult.MANUAL_REVIEW)
-    
-    # Severity counts
-    summary.critical_issues = sum(1 for r in results if r.severity == AuditSeverity.CRITICAL and r.result == ComplianceResult.FAIL)
-    summary.high_issues = sum(1 for r in results if r.severity == AuditSeverity.HIGH and r.result == ComplianceResult.FAIL)
-    summary.medium_issues = sum(1 for r in results if r.severity == AuditSeverity.MEDIUM and r.result == ComplianceResult.FAIL)
-    summary.low_issues = sum(1 for r in results if r.severity == AuditSeverity.LOW and r.result == ComplianceResult.FAIL)
-    
-    # Category breakdown
-    for result in results:
-        if result.category not in summary.category_breakdown:
-            summary.category_breakdown[result.category] = {
-                'total': 0, 'passed': 0, 'failed': 0, 'error': 0
-            }
+    result_counts = [0] * len(RESULT_CODES)
+    failed_by_severity = [0] * len(SEVERITY_CODES)
+    total_time_ms = 0
+    total_weight = passed_weight = 0
+    categories = defaultdict(_category_counts)
+    
+    for r in results:
+        code = RESULT_CODES[r.result]
+        severity_code = SEVERITY_CODES[r.severity]
+        weight = _SEVERITY_WEIGHTS[severity_code]
+        is_passed = code == _PASS_CODE
         
-        summary.category_breakdown[result.category]['total'] += 1
+        # Tallies are indexed by code; boolean increments avoid a branch per outcome
+        result_counts[code] += 1
+        failed_by_severity[severity_code] += code == _FAIL_CODE
+        total_weight += weight
+        passed_weight += weight * is_passed
+        total_time_ms += r.execution_time_ms
         
-        if result.result == ComplianceResult.PASS:
-            summary.category_breakdown[result.category]['passed'] += 1
-        elif result.result == ComplianceResult.FAIL:
-            summary.category_breakdown[result.category]['failed'] += 1
-        elif result.result == ComplianceResult.ERROR:
-            summary.category_breakdown[result.category]['error'] += 1
+        # Category breakdown, expanded to named counters after the loop
+        categories[r.category][code] += 1
+    
+    # Basic counts
+    summary.total_policies = len(results)
+    summary.passed_policies = result_counts[_PASS_CODE]
+    summary.failed_policies = result_counts[_FAIL_CODE]
+    summary.error_policies = result_counts[_ERROR_CODE]
+    summary.not_applicable_policies = result_counts[RESULT_CODES[ComplianceResult.NOT_APPLICABLE]]
+    summary.manual_review_policies = result_counts[RESULT_CODES[ComplianceResult.MANUAL_REVIEW]]
+    
+    # Severity counts, which only cover failures
+    summary.critical_issues = failed_by_severity[SEVERITY_CODES[AuditSeverity.CRITICAL]]
+    summary.high_issues = failed_by_severity[SEVERITY_CODES[AuditSeverity.HIGH]]
+    summary.medium_issues = failed_by_severity[SEVERITY_CODES[AuditSeverity.MEDIUM]]
+    summary.low_issues = failed_by_severity[SEVERITY_CODES[AuditSeverity.LOW]]
+    
+    summary.category_breakdown = {
+        category: {
+            'total': sum(counts),
+            'passed': counts[_PASS_CODE],
+            'failed': counts[_FAIL_CODE],
+            'error': counts[_ERROR_CODE],
+        }
+        for category, counts in categories.items()
+    }
     
     # Performance metrics
     if results:
-        summary.total_execution_time_ms = sum(r.execution_time_ms for r in results)
-        summary.average_policy_time_ms = summary.total_execution_time_ms / len(results)
-    
-    # Compliance scoring
-    summary.compliance_percentage = calculate_compliance_score(results)
-    summary.security_score = calculate_security_score(results)
+        summary.total_execution_time_ms = total_time_ms
+        summary.average_policy_time_ms = total_time_ms / len(results)
+    
+    # Compliance scoring, derived from the pass count above and rounded once so
+    # every stored copy (results, history sidecar, reports) carries the same value
+    if summary.total_policies:
+        summary.compliance_percentage = round(
+            summary.passed_policies / summary.total_policies * 100.0, COMPLIANCE_PERCENTAGE_DIGITS
+        )
+    if total_weight:
+        summary.security_score = (passed_weight / total_weight) * 100.0
     
     return summary
\ No newline at end of file
@@ -0,0 +1,216 @@
+"""
+Persistent PowerShell Host - Step 6
+Long-lived PowerShell process used by the audit engine to execute queries
+without paying interpreter start-up cost for every policy.
+"""
+
+import base64
+import queue
+import secrets
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# =================================================================
+# POWERSHELL HOST
+# =================================================================
+
+@dataclass
+class PowerShellHostConfig:
+    """Picklable settings shared with audit worker threads and processes"""
+    executable: str = "powershell"
+    available: bool = False
+
+# Every script is shipped base64-encoded on a single line so quoting and
+# multi-line constructs never confuse the `-Command -` reader. The wrapper
+# captures the output, derives a return code and then prints an end marker
+# on both streams so the reader threads know where this command stops.
+_COMMAND_WRAPPER = (
+    "$__cisOut = $null; $__cisRc = 0; "
+    "try {{ "
+    "$__cisOut = Invoke-Expression ([Text.Encoding]::UTF8.GetString("
+    "[Convert]::FromBase64String('{payload}'))) | Out-String -Width 4096; "
+    "if (-not $?) {{ $__cisRc = 1 }} "
+    "}} catch {{ [Console]::Error.WriteLine($_.ToString()); $__cisRc = 1 }}; "
+    "[Console]::Out.Write($__cisOut); "
+    "[Console]::Out.WriteLine(''); "
+    "[Console]::Out.WriteLine('{marker} ' + $__cisRc); "
+    "[Console]::Error.WriteLine('{marker}')"
+)
+
+
+class PowerShellHost:
+    """
+    Single long-lived `powershell -Command -` process.
+    Scripts are written to stdin and their output is read back until a
+    unique end marker appears, so one process serves many audit queries.
+    """
+    
+    def __init__(self, executable: str = "powershell"):
+        """Start the PowerShell process and its output reader threads"""
+        self.executable = executable
+        self.process = subprocess.Popen(
+            [executable, "-NoProfile", "-NoLogo", "-NonInteractive", "-Command", "-"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, bufsize=1, encoding="utf-8", errors="replace"
+        )
+        
+        self._lock = threading.Lock()
+        self._scriptblocks = set()
+        self._stdout_lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._stderr_lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        
+        for stream, lines in ((self.process.stdout, self._stdout_lines),
+                              (self.process.stderr, self._stderr_lines)):
+            reader = threading.Thread(target=self._pump, args=(stream, lines), daemon=True)
+            reader.start()
+        
+        # Emit UTF-8 so non-ASCII registry data survives the round-trip
+        self.run("[Console]::OutputEncoding = [Text.Encoding]::UTF8", timeout=30)
+    
+    @staticmethod
+    def _pump(stream, lines: "queue.Queue[Optional[str]]"):
+        """Drain a process stream line by line into a queue"""
+        try:
+            for line in iter(stream.readline, ''):
+                lines.put(line)
+        except (OSError, ValueError):
+            pass
+        finally:
+            lines.put(None)
+    
+    def is_alive(self) -> bool:
+        """Check whether the PowerShell process is still running"""
+        return self.process.poll() is None
+    
+    def run(self, script: str, timeout: float = 60) -> Tuple[int, str, str]:
+        """Execute a script and return (returncode, stdout, stderr)"""
+        with self._lock:
+            return self._run_locked(script, timeout)
+    
+    def _run_locked(self, script: str, timeout: float) -> Tuple[int, str, str]:
+        """Execute a script while the caller holds the host lock"""
+        if not self.is_alive():
+            raise RuntimeError("PowerShell host is not running")
+        
+        marker = f"<<<END {secrets.token_hex(16)}>>>"
+        payload = base64.b64encode(script.encode("utf-8")).decode("ascii")
+        
+        try:
+            self.process.stdin.write(_COMMAND_WRAPPER.format(payload=payload, marker=marker) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            self.close()
+            raise RuntimeError(f"PowerShell host pipe closed: {e}")
+        
+        deadline = time.monotonic() + timeout
+        try:
+            stdout_lines, status = self._read_until(self._stdout_lines, marker, deadline)
+            stderr_lines, _ = self._read_until(self._stderr_lines, marker, deadline)
+        except subprocess.TimeoutExpired:
+            # The process state is unknown after a timeout; never reuse it
+            self.close()
+            raise subprocess.TimeoutExpired(self.executable, timeout)
+        
+        stdout = "".join(stdout_lines)
+        if stdout.endswith("\n"):
+            # Drop the separator line written before the marker
+            stdout = stdout[:-1]
+        
+        try:
+            returncode = int(status)
+        except ValueError:
+            returncode = 1
+        
+        return returncode, stdout, "".join(stderr_lines)
+    
+    def ensure_scriptblock(self, name: str, definition: str):
+        """Run a scriptblock definition once for the lifetime of this host"""
+        # Checked and defined under the run lock, so concurrent callers define it once
+        with self._lock:
+            if name in self._scriptblocks:
+                return
+            
+            returncode, _, stderr = self._run_locked(definition, timeout=30)
+            if returncode != 0:
+                raise RuntimeError(f"Failed to define {name}: {stderr.strip()}")
+            self._scriptblocks.add(name)
+    
+    def _read_until(self, lines: "queue.Queue[Optional[str]]", marker: str,
+                    deadline: float) -> Tuple[List[str], str]:
+        """Collect lines from a stream queue until the end marker is seen"""
+        collected = []
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(self.executable, 0)
+            
+            try:
+                line = lines.get(timeout=remaining)
+            except queue.Empty:
+                raise subprocess.TimeoutExpired(self.executable, 0)
+            
+            if line is None:
+                raise RuntimeError("PowerShell host exited unexpectedly")
+            
+            index = line.find(marker)
+            if index >= 0:
+                if index:
+                    collected.append(line[:index])
+                return collected, line[index + len(marker):].strip()
+            
+            collected.append(line)
+    
+    def close(self):
+        """Terminate the PowerShell process"""
+        if not self.is_alive():
+            return
+        
+        try:
+            self.process.stdin.write("exit\n")
+            self.process.stdin.flush()
+            self.process.wait(timeout=5)
+        except Exception:
+            self.process.kill()
+            try:
+                self.process.wait(timeout=5)
+            except Exception:
+                pass
+
+# =================================================================
+# PER-THREAD HOST MANAGEMENT
+# =================================================================
+
+_thread_state = threading.local()
+_thread_hosts: Dict[threading.Thread, PowerShellHost] = {}
+_thread_hosts_lock = threading.Lock()
+
+def get_thread_host(executable: str = "powershell") -> PowerShellHost:
+    """Get the persistent PowerShell host owned by the calling thread"""
+    host = getattr(_thread_state, "host", None)
+    if host is None or not host.is_alive():
+        host = PowerShellHost(executable)
+        _thread_state.host = host
+        with _thread_hosts_lock:
+            _thread_hosts[threading.current_thread()] = host
+    return host
+
+def release_thread_host():
+    """Close the PowerShell host owned by the calling thread, if any"""
+    host = getattr(_thread_state, "host", None)
+    if host is not None:
+        _thread_state.host = None
+        with _thread_hosts_lock:
+            _thread_hosts.pop(threading.current_thread(), None)
+        host.close()
+
+def reap_thread_hosts():
+    """Close PowerShell hosts whose owning thread has exited"""
+    with _thread_hosts_lock:
+        finished = [thread for thread in _thread_hosts if not thread.is_alive()]
+        hosts = [_thread_hosts.pop(thread) for thread in finished]
+    
+    for host in hosts:
+        host.close()
@@ -4,174 +4,89 @@ Comprehensive report generation for audit results in multiple formats.
 """
 
 import os
-import json
 import csv
 import html
+import functools
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-from dataclasses import asdict
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, TextIO, Tuple
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from .models_audit import (
     AuditRun, PolicyAuditResult, AuditSummary, ReportFormat, 
-    ComplianceResult, AuditSeverity, ReportTemplate
+    ComplianceResult, AuditSeverity, ReportTemplate, dumps_json
 )
 
+# Column headers of CSV reports, in output order
+CSV_REPORT_HEADER = (
+    'Policy ID', 'Policy Name', 'Category', 'CIS Level', 'Result', 
+    'Severity', 'Current Value', 'Expected Value', 'Registry Path', 
+    'Registry Key', 'Error Message', 'Remediation', 'Execution Time (ms)'
+)
+
+# Formats whose placeholder builders write the output of another format
+REPORT_FORMAT_FAMILIES = {
+    ReportFormat.PDF: ReportFormat.HTML,
+    ReportFormat.EXCEL: ReportFormat.CSV,
+}
+
+# Write buffer for CSV and JSON reports, which emit many small pieces per result
+REPORT_WRITE_BUFFER_SIZE = 1 << 20
+
+# Rank used to drop results below a template's minimum severity
+SEVERITY_ORDER = {
+    AuditSeverity.INFORMATIONAL: 0,
+    AuditSeverity.LOW: 1,
+    AuditSeverity.MEDIUM: 2,
+    AuditSeverity.HIGH: 3,
+    AuditSeverity.CRITICAL: 4
+}
+
+# Categories repeat across many rows, so their escaped form is memoized; values,
+# errors and descriptions can be large and unique and are escaped directly
+_escape_repeated = functools.lru_cache(maxsize=4096)(html.escape)
+
+# A failed result with its escaped policy name and remediation; both are None
+# when the remediation guide has to escape them itself
+EscapedFailure = Tuple[PolicyAuditResult, Optional[str], Optional[str]]
+
+# CSS classes and upper-case labels used in HTML reports, built once per enum member
+RESULT_CSS_CLASSES = {
+    ComplianceResult.PASS: "result-pass",
+    ComplianceResult.FAIL: "result-fail",
+    ComplianceResult.ERROR: "result-error",
+    ComplianceResult.NOT_APPLICABLE: "result-na",
+    ComplianceResult.MANUAL_REVIEW: "result-na"
+}
+SEVERITY_CSS_CLASSES = {severity: f"severity-{severity.value}" for severity in AuditSeverity}
+RESULT_LABELS = {result: result.value.upper() for result in ComplianceResult}
+SEVERITY_LABELS = {severity: severity.value.upper() for severity in AuditSeverity}
+
+def iter_report_rows(results: Iterable[PolicyAuditResult]) -> Iterator[Tuple[Any, ...]]:
+    """Yield one CSV row per result, in CSV_REPORT_HEADER order"""
+    for result in results:
+        yield (
+            result.policy_id,
+            result.policy_name,
+            result.category,
+            result.cis_level,
+            result.result.value,
+            result.severity.value,
+            result.current_value or '',
+            result.expected_value or '',
+            result.registry_path or '',
+            result.registry_key or '',
+            result.error_message or '',
+            result.remediation or '',
+            result.execution_time_ms
+        )
+
 # =================================================================
-# REPORT GENERATION ENGINE
+# HTML REPORT ASSETS
 # =================================================================
 
-class ReportGenerator:
-    """
-    Comprehensive report generator for audit results.
-    Supports HTML, PDF, CSV, JSON, and Excel formats.
-    """
-    
-    def __init__(self, reports_dir: str = "reports"):
-        """Initialize report generator with output directory"""
-        self.reports_dir = reports_dir
-        os.makedirs(reports_dir, exist_ok=True)
-        
-        # Setup logging
-        self.logger = logging.getLogger("ReportGenerator")
-        
-        # Load report templates
-        self.templates = self._load_report_templates()
-    
-    def _load_report_templates(self) -> Dict[str, ReportTemplate]:
-        """Load report templates from configuration"""
-        templates = {}
-        
-        # Default templates
-        templates["standard"] = ReportTemplate(
-            name="Standard CIS Audit Report",
-            description="Comprehensive audit report with all sections",
-            include_executive_summary=True,
-            include_detailed_results=True,
-            include_remediation_guide=True,
-            include_trend_analysis=False,
-            include_system_info=True,
-            show_passed_policies=False,
-            show_failed_policies=True,
-            show_errors=True
-        )
-        
-        templates["executive"] = ReportTemplate(
-            name="Executive Summary Report",
-            description="High-level summary for executives",
-            include_executive_summary=True,
-            include_detailed_results=False,
-            include_remediation_guide=False,
-            include_trend_analysis=True,
-            include_system_info=False,
-            show_passed_policies=False,
-            show_failed_policies=True,
-            show_errors=False,
-            minimum_severity=AuditSeverity.HIGH
-        )
-        
-        templates["technical"] = ReportTemplate(
-            name="Technical Implementation Report",
-            description="Detailed technical report for IT teams",
-            include_executive_summary=False,
-            include_detailed_results=True,
-            include_remediation_guide=True,
-            include_trend_analysis=False,
-            include_system_info=True,
-            show_passed_policies=True,
-            show_failed_policies=True,
-            show_errors=True
-        )
-        
-        return templates
-    
-    def generate_report(self, audit_run: AuditRun, format: ReportFormat, 
-                       template_name: str = "standard") -> str:
-        """Generate audit report in specified format"""
-        try:
-            template = self.templates.get(template_name, self.templates["standard"])
-            
-            if format == ReportFormat.HTML:
-                return self._generate_html_report(audit_run, template)
-            elif format == ReportFormat.PDF:
-                return self._generate_pdf_report(audit_run, template)
-            elif format == ReportFormat.CSV:
-                return self._generate_csv_report(audit_run, template)
-            elif format == ReportFormat.JSON:
-                return self._generate_json_report(audit_run, template)
-            elif format == ReportFormat.EXCEL:
-                return self._generate_excel_report(audit_run, template)
-            else:
-                raise ValueError(f"Unsupported report format: {format}")
-                
-        except Exception as e:
-            self.logger.error(f"Failed to generate {format.value} report: {e}")
-            raise
-    
-    def _generate_html_report(self, audit_run: AuditRun, template: ReportTemplate) -> str:
-        """Generate comprehensive HTML report"""
-        try:
-            report_filename = f"audit_report_{audit_run.audit_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-            report_path = os.path.join(self.reports_dir, report_filename)
-            
-            # Filter results based on template settings
-            filtered_results = self._filter_results(audit_run.policy_results, template)
-            
-            html_content = self._build_html_report(audit_run, filtered_results, template)
-            
-            with open(report_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            self.logger.info(f"Generated HTML report: {report_path}")
-            return report_path
-            
-        except Exception as e:
-            self.logger.error(f"Failed to generate HTML report: {e}")
-            raise
-    
-    def _build_html_report(self, audit_run: AuditRun, results: List[PolicyAuditResult], 
-                          template: ReportTemplate) -> str:
-        """Build complete HTML report content"""
-        
-        html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{template.report_title}</title>
-    <style>
-        {self._get_default_css()}
-        {template.custom_css or ''}
-    </style>
-</head>
-<body>
-    <div class="report-container">
-        {self._build_report_header(audit_run, template)}
-        
-        {self._build_executive_summary(audit_run, template) if template.include_executive_summary else ''}
-        
-        {self._build_system_info_section(audit_run, template) if template.include_system_info else ''}
-        
-        {self._build_summary_section(audit_run.summary, template)}
-        
-        {self._build_detailed_results_section(results, template) if template.include_detailed_results else ''}
-        
-        {self._build_remediation_guide_section(results, template) if template.include_remediation_guide else ''}
-        
-        {self._build_report_footer(audit_run, template)}
-    </div>
-    
-    <script>
-        {self._get_report_javascript()}
-    </script>
-</body>
-</html>"""
-        
-        return html
-    
-    def _get_default_css(self) -> str:
-        """Get default CSS styles for HTML reports"""
-        return """
+# Stylesheet and script embedded in every HTML report
+_DEFAULT_CSS = """
         body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             margin: 0;
@@ -426,15 +341,256 @@ class ReportGenerator:
             }
         }
         """
+
+_REPORT_JAVASCRIPT = """
+        document.addEventListener('DOMContentLoaded', function() {
+            // Make table rows collapsible
+            const collapsibles = document.querySelectorAll('.collapsible');
+            collapsibles.forEach(function(collapsible) {
+                collapsible.addEventListener('click', function() {
+                    const nextRow = this.nextElementSibling;
+                    const content = nextRow.querySelector('.collapsible-content');
+                    if (content) {
+                        content.classList.toggle('show');
+                    }
+                });
+            });
+            
+            // Add print functionality
+            if (window.print) {
+                const printBtn = document.createElement('button');
+                printBtn.innerHTML = 'Print Report';
+                printBtn.style.position = 'fixed';
+                printBtn.style.top = '10px';
+                printBtn.style.right = '10px';
+                printBtn.style.padding = '10px 20px';
+                printBtn.style.backgroundColor = '#0066cc';
+                printBtn.style.color = 'white';
+                printBtn.style.border = 'none';
+                printBtn.style.borderRadius = '5px';
+                printBtn.style.cursor = 'pointer';
+                printBtn.style.zIndex = '1000';
+                printBtn.onclick = function() { window.print(); };
+                document.body.appendChild(printBtn);
+            }
+        });
+        """
+
+# Write buffer for streamed HTML reports
+HTML_WRITE_BUFFER_SIZE = 1 << 16
+
+# Fixed parts of the HTML document, assembled once around the per-report content
+_HTML_HEAD = (
+    '<!DOCTYPE html>\n<html lang="en">\n<head>\n'
+    '    <meta charset="UTF-8">\n'
+    '    <meta name="viewport" content="width=device-width, initial-scale=1.0">\n'
+    '    <title>'
+)
+_HTML_STYLE_OPEN = '</title>\n    <style>\n        ' + _DEFAULT_CSS + '\n        '
+_HTML_BODY_OPEN = '\n    </style>\n</head>\n<body>\n    <div class="report-container">\n        '
+_HTML_SECTION_BREAK = '\n        \n        '
+_HTML_CLOSE = (
+    '\n    </div>\n    \n    <script>\n        ' + _REPORT_JAVASCRIPT
+    + '\n    </script>\n</body>\n</html>'
+)
+
+# =================================================================
+# REPORT GENERATION ENGINE
+# =================================================================
+
+class ReportGenerator:
+    """
+    Comprehensive report generator for audit results.
+    Supports HTML, PDF, CSV, JSON, and Excel formats.
+    """
+    
+    # Upper bound on formats built at the same time by generate_reports
+    MAX_REPORT_WORKERS = 4
+    
+    def __init__(self, reports_dir: str = "reports"):
+        """Initialize report generator with output directory"""
+        self.reports_dir = reports_dir
+        os.makedirs(reports_dir, exist_ok=True)
+        
+        # Setup logging
+        self.logger = logging.getLogger("ReportGenerator")
+        
+        # Load report templates
+        self.templates = self._load_report_templates()
+        
+        # Report builders by format, resolved once instead of per report
+        self._format_handlers: Dict[ReportFormat, Callable[..., str]] = {}
+        self.register_format_handler(ReportFormat.HTML, self._generate_html_report)
+        self.register_format_handler(ReportFormat.PDF, self._generate_pdf_report)
+        self.register_format_handler(ReportFormat.CSV, self._generate_csv_report)
+        self.register_format_handler(ReportFormat.JSON, self._generate_json_report)
+        self.register_format_handler(ReportFormat.EXCEL, self._generate_excel_report)
+    
+    def _load_report_templates(self) -> Dict[str, ReportTemplate]:
+        """Load report templates from configuration"""
+        templates = {}
+        
+        # Default templates
+        templates["standard"] = ReportTemplate(
+            name="Standard CIS Audit Report",
+            description="Comprehensive audit report with all sections",
+            include_executive_summary=True,
+            include_detailed_results=True,
+            include_remediation_guide=True,
+            include_trend_analysis=False,
+            include_system_info=True,
+            show_passed_policies=False,
+            show_failed_policies=True,
+            show_errors=True
+        )
+        
+        templates["executive"] = ReportTemplate(
+            name="Executive Summary Report",
+            description="High-level summary for executives",
+            include_executive_summary=True,
+            include_detailed_results=False,
+            include_remediation_guide=False,
+            include_trend_analysis=True,
+            include_system_info=False,
+            show_passed_policies=False,
+            show_failed_policies=True,
+            show_errors=False,
+            minimum_severity=AuditSeverity.HIGH
+        )
+        
+        templates["technical"] = ReportTemplate(
+            name="Technical Implementation Report",
+            description="Detailed technical report for IT teams",
+            include_executive_summary=False,
+            include_detailed_results=True,
+            include_remediation_guide=True,
+            include_trend_analysis=False,
+            include_system_info=True,
+            show_passed_policies=True,
+            show_failed_policies=True,
+            show_errors=True
+        )
+        
+        return templates
+    
+    def generate_report(self, audit_run: AuditRun, format: ReportFormat, 
+                       template_name: str = "standard") -> str:
+        """Generate audit report in specified format"""
+        try:
+            template = self.templates.get(template_name, self.templates["standard"])
+            
+            handler = self._format_handlers.get(format)
+            if handler is None:
+                raise ValueError(f"Unsupported report format: {format}")
+            # One timestamp serves the file name and every section of this report
+            return handler(audit_run, template, datetime.now())
+                
+        except Exception as e:
+            self.logger.error(f"Failed to generate {getattr(format, 'value', format)} report: {e}")
+            raise
+    
+    def generate_reports(self, audit_run: AuditRun, formats: Iterable[ReportFormat],
+                         template_name: str = "standard") -> Dict[str, str]:
+        """Generate several report formats concurrently and return their paths by format value"""
+        # Placeholder formats write the same file as the format they fall back to,
+        # so each family is built in order on one worker
+        families: Dict[ReportFormat, List[ReportFormat]] = {}
+        for format in dict.fromkeys(formats):
+            families.setdefault(REPORT_FORMAT_FAMILIES.get(format, format), []).append(format)
+        
+        paths = {}
+        if not families:
+            return paths
+        
+        def build_family(family: List[ReportFormat]) -> List[Tuple[ReportFormat, str]]:
+            return [(format, self.generate_report(audit_run, format, template_name)) for format in family]
+        
+        # A single family has nothing to overlap with, so it is built on the calling thread
+        if len(families) == 1:
+            for format, path in build_family(next(iter(families.values()))):
+                paths[format.value] = path
+            return paths
+        
+        with ThreadPoolExecutor(max_workers=min(len(families), self.MAX_REPORT_WORKERS),
+                                thread_name_prefix="audit-report") as executor:
+            for built in executor.map(build_family, families.values()):
+                for format, path in built:
+                    paths[format.value] = path
+        
+        return paths
     
-    def _build_report_header(self, audit_run: AuditRun, template: ReportTemplate) -> str:
+    def register_format_handler(self, format: ReportFormat,
+                                handler: Callable[[AuditRun, ReportTemplate, Optional[datetime]], str]):
+        """Use `handler` to build reports of `format`, replacing any existing builder"""
+        self._format_handlers[format] = handler
+    
+    def _generate_html_report(self, audit_run: AuditRun, template: ReportTemplate,
+                              now: Optional[datetime] = None) -> str:
+        """Generate comprehensive HTML report"""
+        try:
+            now = now or datetime.now()
+            report_filename = f"audit_report_{audit_run.audit_id}_{now.strftime('%Y%m%d_%H%M%S')}.html"
+            report_path = os.path.join(self.reports_dir, report_filename)
+            
+            # Filter results based on template settings
+            filtered_results = self._filter_results(audit_run.policy_results, template)
+            
+            # Sections go straight to the file, so the whole document is never held as one string
+            with open(report_path, 'w', encoding='utf-8', buffering=HTML_WRITE_BUFFER_SIZE) as f:
+                self._write_html_report(f, audit_run, filtered_results, template, now)
+            
+            self.logger.info(f"Generated HTML report: {report_path}")
+            return report_path
+            
+        except Exception as e:
+            self.logger.error(f"Failed to generate HTML report: {e}")
+            raise
+    
+    def _write_html_report(self, out: TextIO, audit_run: AuditRun, results: List[PolicyAuditResult],
+                           template: ReportTemplate, now: Optional[datetime] = None):
+        """Write complete HTML report content section by section"""
+        now = now or datetime.now()
+        
+        # Only the title, custom CSS and sections vary; the shell around them is prebuilt
+        out.write(_HTML_HEAD)
+        out.write(template.report_title)
+        out.write(_HTML_STYLE_OPEN)
+        out.write(template.custom_css or '')
+        out.write(_HTML_BODY_OPEN)
+        
+        out.write(self._build_report_header(audit_run, template, now))
+        out.write(_HTML_SECTION_BREAK)
+        if template.include_executive_summary:
+            out.write(self._build_executive_summary(audit_run, template))
+        out.write(_HTML_SECTION_BREAK)
+        if template.include_system_info:
+            out.write(self._build_system_info_section(audit_run, template))
+        out.write(_HTML_SECTION_BREAK)
+        out.write(self._build_summary_section(audit_run.summary, template))
+        out.write(_HTML_SECTION_BREAK)
+        # The remediation guide reuses the failures the results table already walked past
+        collect = template.include_detailed_results and template.include_remediation_guide
+        failed_results = [] if collect else None
+        if template.include_detailed_results:
+            self._write_detailed_results_section(out, results, template, failed_results)
+        out.write(_HTML_SECTION_BREAK)
+        if template.include_remediation_guide:
+            out.write(self._build_remediation_guide_section(results, template, failed_results))
+        out.write(_HTML_SECTION_BREAK)
+        out.write(self._build_report_footer(audit_run, template, now))
+        
+        out.write(_HTML_CLOSE)
+    
+    def _build_report_header(self, audit_run: AuditRun, template: ReportTemplate,
+                             now: Optional[datetime] = None) -> str:
         """Build report header section"""
+        now = now or datetime.now()
         return f"""
         <div class="report-header">
             <h1 class="report-title">{html.escape(template.report_title)}</h1>
             <div class="report-subtitle">
                 <p><strong>{html.escape(template.company_name)}</strong></p>
-                <p>Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>
+                <p>Generated: {now.strftime('%B %d, %Y at %I:%M %p')}</p>
                 <p>Audit ID: {audit_run.audit_id}</p>
             </div>
         </div>
@@ -490,24 +646,39 @@ class ReportGenerator:
     
     def _build_key_findings(self, results: List[PolicyAuditResult]) -> str:
         """Build key findings section"""
-        critical_failures = [r for r in results if r.result == ComplianceResult.FAIL and r.severity == AuditSeverity.CRITICAL]
-        high_failures = [r for r in results if r.result == ComplianceResult.FAIL and r.severity == AuditSeverity.HIGH]
+        # One pass keeps the first three failures of each severity and counts the rest
+        critical_failures = []
+        high_failures = []
+        total_failures = 0
+        for r in results:
+            if r.result is not ComplianceResult.FAIL:
+                continue
+            if r.severity is AuditSeverity.CRITICAL:
+                bucket = critical_failures
+            elif r.severity is AuditSeverity.HIGH:
+                bucket = high_failures
+            else:
+                continue
+            
+            total_failures += 1
+            if len(bucket) < 3:
+                bucket.append(r)
         
-        if not critical_failures and not high_failures:
+        if not total_failures:
             return "<p><strong>Key Findings:</strong> No critical or high-severity issues identified.</p>"
         
         findings_html = "<h3>Key Findings:</h3><ul>"
         
-        for failure in critical_failures[:3]:  # Show top 3 critical
+        for failure in critical_failures:  # Show top 3 critical
             findings_html += f"<li><strong>Critical:</strong> {html.escape(failure.policy_name)} - {html.escape(failure.error_message or 'Failed compliance check')}</li>"
         
-        for failure in high_failures[:3]:  # Show top 3 high
+        for failure in high_failures:  # Show top 3 high
             findings_html += f"<li><strong>High:</strong> {html.escape(failure.policy_name)} - {html.escape(failure.error_message or 'Failed compliance check')}</li>"
         
         findings_html += "</ul>"
         
-        if len(critical_failures) + len(high_failures) > 6:
-            findings_html += f"<p><em>And {len(critical_failures) + len(high_failures) - 6} more high/critical issues...</em></p>"
+        if total_failures > 6:
+            findings_html += f"<p><em>And {total_failures - 6} more high/critical issues...</em></p>"
         
         return findings_html
     
@@ -628,40 +799,18 @@ class ReportGenerator:
         </div>
         """
     
-    def _build_detailed_results_section(self, results: List[PolicyAuditResult], template: ReportTemplate) -> str:
-        """Build detailed results section"""
+    def _write_detailed_results_section(self, out: TextIO, results: List[PolicyAuditResult],
+                                        template: ReportTemplate,
+                                        failed_results: Optional[List[EscapedFailure]] = None):
+        """
+        Write detailed results section, one table row at a time. Failed results
+        with remediation text are appended to `failed_results` when given,
+        together with their already escaped name and remediation.
+        """
         if not results:
-            return ""
-        
-        table_rows = ""
-        for result in results:
-            result_class = self._get_result_class(result.result)
-            severity_class = f"severity-{result.severity.value}"
-            
-            table_rows += f"""
-            <tr class="collapsible">
-                <td>{html.escape(result.policy_name)}</td>
-                <td>{html.escape(result.category)}</td>
-                <td class="{result_class}">{result.result.value.upper()}</td>
-                <td><span class="{severity_class}">{result.severity.value.upper()}</span></td>
-                <td>{result.cis_level}</td>
-                <td>{result.execution_time_ms} ms</td>
-            </tr>
-            <tr>
-                <td colspan="6">
-                    <div class="collapsible-content">
-                        <p><strong>Description:</strong> {html.escape(result.description)}</p>
-                        {f'<p><strong>Current Value:</strong> {html.escape(result.current_value)}</p>' if result.current_value else ''}
-                        {f'<p><strong>Expected Value:</strong> {html.escape(result.expected_value)}</p>' if result.expected_value else ''}
-                        {f'<p><strong>Registry Path:</strong> {html.escape(result.registry_path)}</p>' if result.registry_path else ''}
-                        {f'<p><strong>Error:</strong> {html.escape(result.error_message)}</p>' if result.error_message else ''}
-                        {f'<div class="remediation-box"><strong>Remediation:</strong> {html.escape(result.remediation)}</div>' if result.remediation else ''}
-                    </div>
-                </td>
-            </tr>
-            """
+            return
         
-        return f"""
+        out.write("""
         <div class="section">
             <h2 class="section-title">Detailed Results</h2>
             <table class="results-table">
@@ -676,32 +825,102 @@ class ReportGenerator:
                     </tr>
                 </thead>
                 <tbody>
-                    {table_rows}
+                    """)
+        
+        write_row = self._detailed_row_writer(out, failed_results)
+        for result in results:
+            write_row(result)
+        
+        out.write("""
                 </tbody>
             </table>
         </div>
+        """)
+    
+    @staticmethod
+    def _detailed_row_writer(out: TextIO, failed_results: Optional[List[EscapedFailure]] = None
+                             ) -> Callable[[PolicyAuditResult], None]:
         """
+        Choose the row writer of the detailed results table once per report:
+        failures are only collected when the template also has a remediation guide.
+        """
+        # Everything the rows use is bound to locals once, so each row skips
+        # the global and attribute lookups
+        write = out.write
+        escape = html.escape
+        escape_repeated = _escape_repeated
+        result_classes, result_labels = RESULT_CSS_CLASSES, RESULT_LABELS
+        severity_classes, severity_labels = SEVERITY_CSS_CLASSES, SEVERITY_LABELS
+        
+        def row_html(result: PolicyAuditResult, name_html: str, remediation_html: str) -> str:
+            return f"""
+            <tr class="collapsible">
+                <td>{name_html}</td>
+                <td>{escape_repeated(result.category)}</td>
+                <td class="{result_classes[result.result]}">{result_labels[result.result]}</td>
+                <td><span class="{severity_classes[result.severity]}">{severity_labels[result.severity]}</span></td>
+                <td>{result.cis_level}</td>
+                <td>{result.execution_time_ms} ms</td>
+            </tr>
+            <tr>
+                <td colspan="6">
+                    <div class="collapsible-content">
+                        <p><strong>Description:</strong> {escape(result.description)}</p>
+                        {f'<p><strong>Current Value:</strong> {escape(result.current_value)}</p>' if result.current_value else ''}
+                        {f'<p><strong>Expected Value:</strong> {escape(result.expected_value)}</p>' if result.expected_value else ''}
+                        {f'<p><strong>Registry Path:</strong> {escape(result.registry_path)}</p>' if result.registry_path else ''}
+                        {f'<p><strong>Error:</strong> {escape(result.error_message)}</p>' if result.error_message else ''}
+                        {f'<div class="remediation-box"><strong>Remediation:</strong> {remediation_html}</div>' if remediation_html else ''}
+                    </div>
+                </td>
+            </tr>
+            """
+        
+        if failed_results is None:
+            def write_row(result: PolicyAuditResult):
+                write(row_html(result, escape(result.policy_name),
+                               escape(result.remediation) if result.remediation else ''))
+            return write_row
+        
+        collect = failed_results.append
+        fail = ComplianceResult.FAIL
+        
+        def write_and_collect_row(result: PolicyAuditResult):
+            name_html = escape(result.policy_name)
+            remediation_html = escape(result.remediation) if result.remediation else ''
+            if result.result is fail and remediation_html:
+                collect((result, name_html, remediation_html))
+            write(row_html(result, name_html, remediation_html))
+        return write_and_collect_row
     
-    def _build_remediation_guide_section(self, results: List[PolicyAuditResult], template: ReportTemplate) -> str:
-        """Build remediation guide section"""
-        failed_results = [r for r in results if r.result == ComplianceResult.FAIL and r.remediation]
+    def _build_remediation_guide_section(self, results: List[PolicyAuditResult], template: ReportTemplate,
+                                         failed_results: Optional[List[EscapedFailure]] = None) -> str:
+        """Build remediation guide section, from precollected failures when available"""
+        if failed_results is None:
+            failed_results = [(r, None, None) for r in results if r.result is ComplianceResult.FAIL and r.remediation]
         
         if not failed_results:
             return ""
         
-        remediation_items = ""
-        for result in failed_results[:20]:  # Limit to top 20 for readability
-            severity_class = f"severity-{result.severity.value}"
-            remediation_items += f"""
+        item_parts = []
+        for result, name_html, remediation_html in failed_results[:20]:  # Limit to top 20 for readability
+            if name_html is None:
+                name_html = html.escape(result.policy_name)
+                remediation_html = html.escape(result.remediation)
+            
+            severity_class = SEVERITY_CSS_CLASSES[result.severity]
+            item_parts.append(f"""
             <div class="remediation-box">
-                <h4>{html.escape(result.policy_name)} <span class="{severity_class}">{result.severity.value.upper()}</span></h4>
+                <h4>{name_html} <span class="{severity_class}">{SEVERITY_LABELS[result.severity]}</span></h4>
                 <p><strong>Issue:</strong> {html.escape(result.error_message or 'Policy compliance check failed')}</p>
                 <p><strong>Current Value:</strong> {html.escape(result.current_value or 'Not detected')}</p>
                 <p><strong>Expected Value:</strong> {html.escape(result.expected_value or 'See CIS documentation')}</p>
-                <p><strong>Remediation:</strong> {html.escape(result.remediation)}</p>
+                <p><strong>Remediation:</strong> {remediation_html}</p>
                 {f'<p><strong>Registry Path:</strong> {html.escape(result.registry_path)}</p>' if result.registry_path else ''}
             </div>
-            """
+            """)
+        
+        remediation_items = "".join(item_parts)
         
         return f"""
         <div class="section">
@@ -712,87 +931,35 @@ class ReportGenerator:
         </div>
         """
     
-    def _build_report_footer(self, audit_run: AuditRun, template: ReportTemplate) -> str:
+    def _build_report_footer(self, audit_run: AuditRun, template: ReportTemplate,
+                             now: Optional[datetime] = None) -> str:
         """Build report footer"""
+        now = now or datetime.now()
         return f"""
         <div class="footer">
-            <p>This report was generated by the CIS GPO Compliance Tool on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>
+            <p>This report was generated by the CIS GPO Compliance Tool on {now.strftime('%B %d, %Y at %I:%M %p')}</p>
             <p>Audit ID: {audit_run.audit_id} | Report Version: 1.0</p>
-            <p>&copy; {datetime.now().year} {html.escape(template.company_name)}. All rights reserved.</p>
+            <p>&copy; {now.year} {html.escape(template.company_name)}. All rights reserved.</p>
         </div>
         """
     
-    def _get_report_javascript(self) -> str:
-        """Get JavaScript for interactive report features"""
-        return """
-        document.addEventListener('DOMContentLoaded', function() {
-            // Make table rows collapsible
-            const collapsibles = document.querySelectorAll('.collapsible');
-            collapsibles.forEach(function(collapsible) {
-                collapsible.addEventListener('click', function() {
-                    const nextRow = this.nextElementSibling;
-                    const content = nextRow.querySelector('.collapsible-content');
-                    if (content) {
-                        content.classList.toggle('show');
-                    }
-                });
-            });
-            
-            // Add print functionality
-            if (window.print) {
-                const printBtn = document.createElement('button');
-                printBtn.innerHTML = 'Print Report';
-                printBtn.style.position = 'fixed';
-                printBtn.style.top = '10px';
-                printBtn.style.right = '10px';
-                printBtn.style.padding = '10px 20px';
-                printBtn.style.backgroundColor = '#0066cc';
-                printBtn.style.color = 'white';
-                printBtn.style.border = 'none';
-                printBtn.style.borderRadius = '5px';
-                printBtn.style.cursor = 'pointer';
-                printBtn.style.zIndex = '1000';
-                printBtn.onclick = function() { window.print(); };
-                document.body.appendChild(printBtn);
-            }
-        });
-        """
-    
-    def _generate_csv_report(self, audit_run: AuditRun, template: ReportTemplate) -> str:
+    def _generate_csv_report(self, audit_run: AuditRun, template: ReportTemplate,
+                             now: Optional[datetime] = None) -> str:
         """Generate CSV report"""
         try:
-            report_filename = f"audit_report_{audit_run.audit_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            now = now or datetime.now()
+            report_filename = f"audit_report_{audit_run.audit_id}_{now.strftime('%Y%m%d_%H%M%S')}.csv"
             report_path = os.path.join(self.reports_dir, report_filename)
             
-            # Filter results based on template settings
-            filtered_results = self._filter_results(audit_run.policy_results, template)
-            
-            with open(report_path, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = [
-                    'Policy ID', 'Policy Name', 'Category', 'CIS Level', 'Result', 
-                    'Severity', 'Current Value', 'Expected Value', 'Registry Path', 
-                    'Registry Key', 'Error Message', 'Remediation', 'Execution Time (ms)'
-                ]
+            with open(report_path, 'w', newline='', encoding='utf-8',
+                      buffering=REPORT_WRITE_BUFFER_SIZE) as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(CSV_REPORT_HEADER)
                 
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                for result in filtered_results:
-                    writer.writerow({
-                        'Policy ID': result.policy_id,
-                        'Policy Name': result.policy_name,
-                        'Category': result.category,
-                        'CIS Level': result.cis_level,
-                        'Result': result.result.value,
-                        'Severity': result.severity.value,
-                        'Current Value': result.current_value or '',
-                        'Expected Value': result.expected_value or '',
-                        'Registry Path': result.registry_path or '',
-                        'Registry Key': result.registry_key or '',
-                        'Error Message': result.error_message or '',
-                        'Remediation': result.remediation or '',
-                        'Execution Time (ms)': result.execution_time_ms
-                    })
+                # Results are filtered and formatted lazily as the writer consumes them
+                writer.writerows(iter_report_rows(
+                    self._iter_filtered_results(audit_run.policy_results, template)
+                ))
             
             self.logger.info(f"Generated CSV report: {report_path}")
             return report_path
@@ -801,30 +968,31 @@ class ReportGenerator:
             self.logger.error(f"Failed to generate CSV report: {e}")
             raise
     
-    def _generate_json_report(self, audit_run: AuditRun, template: ReportTemplate) -> str:
+    def _generate_json_report(self, audit_run: AuditRun, template: ReportTemplate,
+                              now: Optional[datetime] = None) -> str:
         """Generate JSON report"""
         try:
-            report_filename = f"audit_report_{audit_run.audit_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            now = now or datetime.now()
+            report_filename = f"audit_report_{audit_run.audit_id}_{now.strftime('%Y%m%d_%H%M%S')}.json"
             report_path = os.path.join(self.reports_dir, report_filename)
             
-            # Filter results based on template settings
-            filtered_results = self._filter_results(audit_run.policy_results, template)
-            
             report_data = {
                 "report_info": {
                     "audit_id": audit_run.audit_id,
-                    "generated_at": datetime.now().isoformat(),
+                    "generated_at": now.isoformat(),
                     "template_name": template.name,
                     "report_version": "1.0"
                 },
-                "system_info": asdict(audit_run.system_info) if template.include_system_info else None,
-                "audit_configuration": asdict(audit_run.configuration),
-                "summary": asdict(audit_run.summary) if audit_run.summary else None,
-                "results": [asdict(result) for result in filtered_results]
+                "system_info": audit_run.system_info if template.include_system_info else None,
+                "audit_configuration": audit_run.configuration,
+                "summary": audit_run.summary
             }
             
-            with open(report_path, 'w', encoding='utf-8') as f:
-                json.dump(report_data, f, indent=2, default=str, ensure_ascii=False)
+            # The models are encoded directly, so enums and datetimes are
+            # written the same way as in the stored result files
+            with open(report_path, 'wb', buffering=REPORT_WRITE_BUFFER_SIZE) as f:
+                self._write_json_report(f, report_data,
+                                        self._iter_filtered_results(audit_run.policy_results, template))
             
             self.logger.info(f"Generated JSON report: {report_path}")
             return report_path
@@ -833,11 +1001,33 @@ class ReportGenerator:
             self.logger.error(f"Failed to generate JSON report: {e}")
             raise
     
-    def _generate_pdf_report(self, audit_run: AuditRun, template: ReportTemplate) -> str:
+    @staticmethod
+    def _write_json_report(f, report_data: Dict[str, Any], results: Iterable[PolicyAuditResult]):
+        """
+        Write an indented JSON report whose last key, "results", is encoded one
+        result at a time. The bytes match encoding the whole document at once.
+        """
+        # Envelope keys are written one by one, each value indented a level deeper
+        separator = b"{\n  "
+        for key, value in report_data.items():
+            f.write(separator + dumps_json(key) + b": " + dumps_json(value, indent=True).replace(b"\n", b"\n  "))
+            separator = b",\n  "
+        f.write(separator + b'"results": [')
+        
+        separator = b"\n    "
+        for result in results:
+            # JSON strings never hold raw newlines, so this only shifts structure
+            f.write(separator + dumps_json(result, indent=True).replace(b"\n", b"\n    "))
+            separator = b",\n    "
+        
+        f.write(b"]\n}" if separator == b"\n    " else b"\n  ]\n}")
+    
+    def _generate_pdf_report(self, audit_run: AuditRun, template: ReportTemplate,
+                             now: Optional[datetime] = None) -> str:
         """Generate PDF report (placeholder - requires additional library)"""
         try:
             # For now, generate HTML and suggest PDF conversion
-            html_path = self._generate_html_report(audit_run, template)
+            html_path = self._generate_html_report(audit_run, template, now)
             
             # PDF generation would require libraries like weasyprint or reportlab
             # For now, return the HTML path with a note
@@ -848,11 +1038,12 @@ class ReportGenerator:
             self.logger.error(f"Failed to generate PDF report: {e}")
             raise
     
-    def _generate_excel_report(self, audit_run: AuditRun, template: ReportTemplate) -> str:
+    def _generate_excel_report(self, audit_run: AuditRun, template: ReportTemplate,
+                               now: Optional[datetime] = None) -> str:
         """Generate Excel report (placeholder - requires additional library)"""
         try:
             # For now, generate CSV and suggest Excel conversion
-            csv_path = self._generate_csv_report(audit_run, template)
+            csv_path = self._generate_csv_report(audit_run, template, now)
             
             # Excel generation would require libraries like openpyxl or xlsxwriter
             # For now, return the CSV path with a note
@@ -865,42 +1056,24 @@ class ReportGenerator:
     
     def _filter_results(self, results: List[PolicyAuditResult], template: ReportTemplate) -> List[PolicyAuditResult]:
         """Filter results based on template settings"""
-        filtered = []
+        return list(self._iter_filtered_results(results, template))
+    
+    def _iter_filtered_results(self, results: Iterable[PolicyAuditResult],
+                               template: ReportTemplate) -> Iterator[PolicyAuditResult]:
+        """Yield the results a template shows, in their original order"""
+        # The template flags reduce to one set of shown outcomes and one set of shown severities
+        hidden_results = {
+            ComplianceResult.PASS: not template.show_passed_policies,
+            ComplianceResult.FAIL: not template.show_failed_policies,
+            ComplianceResult.ERROR: not template.show_errors,
+        }
+        shown_results = frozenset(r for r in ComplianceResult if not hidden_results.get(r, False))
+        minimum_rank = SEVERITY_ORDER.get(template.minimum_severity, 0)
+        shown_severities = frozenset(s for s, rank in SEVERITY_ORDER.items() if rank >= minimum_rank)
         
         for result in results:
-            # Filter by result type
-            if result.result == ComplianceResult.PASS and not template.show_passed_policies:
-                continue
-            if result.result == ComplianceResult.FAIL and not template.show_failed_policies:
-                continue
-            if result.result == ComplianceResult.ERROR and not template.show_errors:
-                continue
-            
-            # Filter by severity
-            severity_order = {
-                AuditSeverity.INFORMATIONAL: 0,
-                AuditSeverity.LOW: 1,
-                AuditSeverity.MEDIUM: 2,
-                AuditSeverity.HIGH: 3,
-                AuditSeverity.CRITICAL: 4
-            }
-            
-            if severity_order.get(result.severity, 0) < severity_order.get(template.minimum_severity, 0):
-                continue
-            
-            filtered.append(result)
-        
-        return filtered
-    
-    def _get_result_class(self, result: ComplianceResult) -> str:
-        """Get CSS class for result type"""
-        return {
-            ComplianceResult.PASS: "result-pass",
-            ComplianceResult.FAIL: "result-fail",
-            ComplianceResult.ERROR: "result-error",
-            ComplianceResult.NOT_APPLICABLE: "result-na",
-            ComplianceResult.MANUAL_REVIEW: "result-na"
-        }.get(result, "result-na")
+            if result.result in shown_results and result.severity in shown_severities:
+                yield result
     
     def _format_bytes(self, bytes_value: int) -> str:
         """Format bytes into human readable format"""
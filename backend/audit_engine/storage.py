@@ -0,0 +1,216 @@
+"""
+Audit Storage Utilities - Step 6
+Atomic file writes and batched durability for persisted audit data.
+"""
+
+import os
+import queue
+import tempfile
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+# A finished temporary file and the path it will be moved to
+PendingWrite = Tuple[str, str]
+
+# =================================================================
+# ATOMIC FILE WRITES
+# =================================================================
+
+@contextmanager
+def atomic_write(path: str, fsync: bool = True, buffering: int = -1,
+                 pending: Optional[List[PendingWrite]] = None):
+    """
+    Write a binary file under a temporary name and move it into place once
+    complete. When `pending` is given the temporary file is only recorded
+    there and is moved into place later by commit_writes.
+    """
+    directory, name = os.path.split(path)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory or ".")
+    try:
+        with os.fdopen(fd, 'wb', buffering=buffering) as f:
+            yield f
+            if fsync and pending is None:
+                f.flush()
+                os.fsync(f.fileno())
+        
+        if pending is not None:
+            pending.append((temp_path, path))
+        else:
+            os.replace(temp_path, path)
+    except BaseException:
+        _discard(temp_path)
+        raise
+
+def commit_writes(pending: List[PendingWrite], fsync: bool = True):
+    """Flush a group of temporary files, then move them all into place"""
+    try:
+        _flush_and_replace(pending, fsync)
+    except BaseException:
+        for temp_path, _ in pending:
+            _discard(temp_path)
+        raise
+    
+    if fsync:
+        _sync_directories(pending)
+
+def _flush_and_replace(pending: List[PendingWrite], fsync: bool):
+    """Flush temporary files to disk and rename them over their targets"""
+    if fsync:
+        for temp_path, _ in pending:
+            # Windows can only flush handles that were opened for writing
+            fd = os.open(temp_path, os.O_RDWR)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+    
+    for temp_path, path in pending:
+        os.replace(temp_path, path)
+
+def _sync_directories(pending: List[PendingWrite]):
+    """Persist renames with one flush per target directory (POSIX only)"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    
+    for directory in {os.path.dirname(path) or "." for _, path in pending}:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+def _discard(temp_path: str):
+    """Remove a temporary file if it is still there"""
+    try:
+        os.unlink(temp_path)
+    except FileNotFoundError:
+        pass
+
+def read_bytes(path: str) -> bytes:
+    """Read a whole file with unbuffered reads sized from its current length"""
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        remaining = os.fstat(fd).st_size
+        chunks = []
+        while True:
+            # Normally one read returns everything and a second confirms EOF
+            chunk = os.read(fd, max(remaining, 65536))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
+def iter_lines_reversed(path: str, block_size: int = 65536) -> Iterator[bytes]:
+    """Yield the non-empty lines of a file from last to first, reading backwards in blocks"""
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = b""
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            lines = (f.read(read_size) + remainder).split(b"\n")
+            
+            # The first piece may continue in the previous block
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line
+        
+        if remainder:
+            yield remainder
+
+# =================================================================
+# GROUP COMMIT
+# =================================================================
+
+class GroupCommitWriter:
+    """
+    Background committer for atomic writes. Saves that finish close together
+    are flushed and renamed as one group, so each directory is synced once
+    per group rather than once per saved file.
+    """
+    
+    def __init__(self, max_batch: int = 16):
+        """Create a committer that groups at most `max_batch` saves"""
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Optional[Tuple[List[PendingWrite], Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    def commit(self, pending: List[PendingWrite]):
+        """Commit the writes of one save and wait until they are durable"""
+        self.submit(pending).result()
+    
+    def submit(self, pending: List[PendingWrite]) -> Future:
+        """Queue the writes of one save for the next group commit"""
+        future = Future()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-commit", daemon=True)
+                self._thread.start()
+            self._queue.put((pending, future))
+        return future
+    
+    def close(self, wait: bool = True):
+        """Stop the committer after the queued saves have been handled"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._queue.put(None)
+        
+        if thread is not None and wait:
+            thread.join()
+    
+    def _run(self):
+        """Drain queued saves in groups until closed"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            
+            batch = [item]
+            closing = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+            
+            self._commit_batch(batch)
+            if closing:
+                return
+    
+    @staticmethod
+    def _commit_batch(batch: List[Tuple[List[PendingWrite], Future]]):
+        """Commit a group of saves, isolating failures to the save that caused them"""
+        # Each save's own files are flushed, so a failure is reported to that save only
+        committed = []
+        for pending, future in batch:
+            try:
+                _flush_and_replace(pending, fsync=True)
+                committed.append((pending, future))
+            except Exception as e:
+                for temp_path, _ in pending:
+                    _discard(temp_path)
+                future.set_exception(e)
+        
+        # Saves landing in the same directory share a single directory flush
+        try:
+            _sync_directories([write for pending, _ in committed for write in pending])
+        except Exception as e:
+            for _, future in committed:
+                future.set_exception(e)
+            return
+        
+        for _, future in committed:
+            future.set_result(None)
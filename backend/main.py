@@ -159,6 +159,8 @@ class AuditConfigurationRequest(BaseModel):
     categories: Optional[List[str]] = None
     parallel_execution: bool = True
     max_workers: int = 10
+    use_processes: bool = False
+    batch_size: int = 64
     timeout_seconds: int = 300
     generate_report: bool = True
     report_formats: Optional[List[str]] = None
@@ -2423,6 +2425,8 @@ async def create_audit_configuration(request: AuditConfigurationRequest):
             categories=request.categories or [],
             parallel_execution=request.parallel_execution,
             max_workers=request.max_workers,
+            use_processes=request.use_processes,
+            batch_size=request.batch_size,
             timeout_seconds=request.timeout_seconds,
             generate_report=request.generate_report,
             report_formats=report_formats,
@@ -2489,6 +2493,8 @@ async def start_audit(request: AuditConfigurationRequest):
             categories=request.categories or [],
             parallel_execution=request.parallel_execution,
             max_workers=request.max_workers,
+            use_processes=request.use_processes,
+            batch_size=request.batch_size,
             timeout_seconds=request.timeout_seconds,
             generate_report=request.generate_report,
             target_system=request.target_system
@@ -2541,7 +2547,7 @@ async def get_audit_runs(
 async def get_audit_run(audit_id: str):
     """Get specific audit run with detailed results"""
     try:
-        audit_run = audit_manager.get_audit_status(audit_id)
+        audit_run = audit_manager.get_audit_run(audit_id)
         if not audit_run:
             raise HTTPException(status_code=404, detail="Audit run not found")
         
@@ -4917,6 +4923,9 @@ async def shutdown_event():
     print("📊 Stopping real-time monitoring...")
     await realtime_manager.stop_monitoring()
     print("✅ Real-time monitoring stopped")
+    
+    # Let queued audit runs go without blocking interpreter exit
+    audit_manager.audit_engine.shutdown(wait=False)
 
 
 # ============================================================================
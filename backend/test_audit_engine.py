@@ -0,0 +1,1403 @@
+"""
+Audit Engine - Test Suite
+Tests caching, atomic storage, PowerShell hosts, the audit history index,
+the streaming report writers, policy matching and execution, and the audit
+manager's search, comparison and configuration storage
+"""
+
+import os
+import sys
+import csv
+import io
+import time
+import gc
+import queue
+import threading
+import base64
+import logging
+import platform
+import tempfile
+import subprocess
+import stat
+from concurrent.futures import Future
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from audit_engine import models_audit, storage, powershell_host
+from audit_engine import audit_engine as audit_engine_module
+from audit_engine.caching import TTLCache
+from audit_engine.storage import (
+    atomic_write, commit_writes, read_bytes, iter_lines_reversed, GroupCommitWriter
+)
+from audit_engine.powershell_host import (
+    PowerShellHost, PowerShellHostConfig, get_thread_host, release_thread_host, reap_thread_hosts,
+    _COMMAND_WRAPPER
+)
+from audit_engine.audit_engine import (
+    WindowsAuditEngine, AuditRuleIndex, PolicySnapshot, audit_policy, _build_batch_script,
+    _compile_audit_rule, _output_contains_expected, _registry_value_matches, _snapshot_kind,
+    _SNAPSHOT_PARSERS
+)
+from audit_engine.audit_manager import AuditManager
+from audit_engine.report_generator import ReportGenerator, CSV_REPORT_HEADER
+from audit_engine.models_audit import (
+    AuditConfiguration, AuditRun, AuditSummary, PolicyAuditResult, SystemInfo, AuditScope,
+    AuditStatus, ComplianceResult, AuditSeverity, AuditMethod, ReportFormat, dumps_json, loads_json,
+    generate_audit_summary, validate_audit_summary, deserialize_audit_run
+)
+
+def print_section(title: str):
+    """Print a formatted section header"""
+    print("\n" + "=" * 80)
+    print(f"  {title}")
+    print("=" * 80)
+
+SYSTEM_INFO = SystemInfo(hostname="host", os_version="10", os_build="19045", architecture="x64")
+
+def make_results(count: int):
+    """Build results covering every outcome, severity and optional field"""
+    outcomes = list(ComplianceResult)
+    severities = list(AuditSeverity)
+    return [
+        PolicyAuditResult(
+            policy_id=f"policy_{i}",
+            policy_name=f'Policy <{i}> "Ñame"',
+            policy_title=f"Title {i}",
+            category=f"Category {i % 3}",
+            cis_level=1 + i % 2,
+            description="Line one\nline two & more",
+            result=outcomes[i % len(outcomes)],
+            severity=severities[i % len(severities)],
+            current_value="1" if i % 3 else None,
+            expected_value="1",
+            registry_path="HKLM\\SOFTWARE\\Test" if i % 2 else None,
+            remediation="Set the value to 1" if i % 2 else None,
+            error_message="Access denied, code 5" if i % 5 == 0 else None,
+            execution_time_ms=i
+        )
+        for i in range(count)
+    ]
+
+def make_engine(data_dir: str) -> WindowsAuditEngine:
+    """Create an engine whose log handler can be closed after the test"""
+    return WindowsAuditEngine(data_dir)
+
+def close_engine(engine: WindowsAuditEngine):
+    """Stop the engine's workers and release its log file"""
+    engine.shutdown()
+    for handler in list(engine.logger.handlers):
+        engine.logger.removeHandler(handler)
+        handler.close()
+
+# =================================================================
+# CACHING
+# =================================================================
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test 1: TTLCache evicts the least recently used entry when full"""
+    print_section("TEST 1: TTLCache LRU Eviction")
+    
+    cache = TTLCache(maxsize=2, ttl=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    
+    # "b" is now the least recently used entry
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+    
+    assert cache.pop("a") == 1
+    assert cache.pop("a", "missing") == "missing"
+    cache.clear()
+    assert len(cache) == 0
+    print("✅ Entries are evicted in least-recently-used order")
+
+def test_ttl_cache_expires_entries():
+    """Test 2: TTLCache entries expire after their ttl"""
+    print_section("TEST 2: TTLCache Expiry")
+    
+    cache = TTLCache(maxsize=10, ttl=0.05)
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    
+    time.sleep(0.1)
+    assert cache.get("key", "expired") == "expired"
+    assert len(cache) == 0
+    print("✅ Expired entries are dropped on access")
+
+# =================================================================
+# STORAGE
+# =================================================================
+
+def test_atomic_write_replaces_file():
+    """Test 3: atomic_write replaces the target and leaves no temporary files"""
+    print_section("TEST 3: Atomic Write")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data.json")
+        with atomic_write(path) as f:
+            f.write(b"first")
+        with atomic_write(path, fsync=False) as f:
+            f.write(b"second")
+        assert read_bytes(path) == b"second"
+        
+        # A failed write keeps the previous content and removes its temporary file
+        try:
+            with atomic_write(path) as f:
+                f.write(b"partial")
+                raise RuntimeError("interrupted")
+        except RuntimeError:
+            pass
+        assert read_bytes(path) == b"second"
+        assert os.listdir(tmp) == ["data.json"]
+    print("✅ Completed writes replace the file, failed writes leave it intact")
+
+def test_pending_writes_commit_together():
+    """Test 4: pending atomic writes only appear once committed"""
+    print_section("TEST 4: Pending Writes")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f"file_{i}.json") for i in range(3)]
+        pending = []
+        for i, path in enumerate(paths):
+            with atomic_write(path, pending=pending) as f:
+                f.write(str(i).encode())
+        
+        assert len(pending) == 3
+        assert not any(os.path.exists(path) for path in paths)
+        
+        commit_writes(pending)
+        assert [read_bytes(path) for path in paths] == [b"0", b"1", b"2"]
+        assert sorted(os.listdir(tmp)) == sorted(os.path.basename(path) for path in paths)
+    print("✅ Pending writes are moved into place by commit_writes")
+
+def test_group_commit_writer():
+    """Test 5: GroupCommitWriter commits every submitted save"""
+    print_section("TEST 5: Group Commit Writer")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = GroupCommitWriter(max_batch=4)
+        futures = []
+        for i in range(10):
+            pending = []
+            with atomic_write(os.path.join(tmp, f"save_{i}.json"), pending=pending) as f:
+                f.write(str(i).encode())
+            futures.append(writer.submit(pending))
+        
+        # A save whose temporary file vanished fails on its own
+        broken = writer.submit([(os.path.join(tmp, "missing.tmp"), os.path.join(tmp, "broken.json"))])
+        for future in futures:
+            future.result(timeout=10)
+        assert broken.exception(timeout=10) is not None
+        writer.close()
+        
+        for i in range(10):
+            assert read_bytes(os.path.join(tmp, f"save_{i}.json")) == str(i).encode()
+        assert not os.path.exists(os.path.join(tmp, "broken.json"))
+    print("✅ Grouped saves are committed and failures stay isolated")
+
+def test_iter_lines_reversed():
+    """Test 6: iter_lines_reversed matches reading the file forwards"""
+    print_section("TEST 6: Reverse Line Reader")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index.jsonl")
+        contents = [
+            b"",
+            b"single",
+            b"one\ntwo\nthree\n",
+            b"no trailing newline\nlast",
+            b"\n\nblank\n\nlines\n\n",
+            b"".join(b"line %d %s\n" % (i, b"x" * i) for i in range(50)),
+        ]
+        for content in contents:
+            with open(path, 'wb') as f:
+                f.write(content)
+            expected = [line for line in reversed(content.split(b"\n")) if line]
+            for block_size in (1, 3, 7, 64, 65536):
+                assert list(iter_lines_reversed(path, block_size)) == expected, (content, block_size)
+    print("✅ Lines are yielded last to first for every block size")
+
+# =================================================================
+# POWERSHELL HOST FRAMING
+# =================================================================
+
+def make_host() -> PowerShellHost:
+    """Host object for framing tests, without starting a PowerShell process"""
+    host = PowerShellHost.__new__(PowerShellHost)
+    host.executable = "powershell"
+    return host
+
+def test_command_wrapper_framing():
+    """Test 7: the command wrapper carries the payload and end marker"""
+    print_section("TEST 7: Command Wrapper")
+    
+    script = "Get-ItemProperty 'HKLM:\\Software'\n'multi\nline'"
+    payload = base64.b64encode(script.encode("utf-8")).decode("ascii")
+    command = _COMMAND_WRAPPER.format(payload=payload, marker="<<<END abc>>>")
+    
+    assert "\n" not in command
+    assert f"FromBase64String('{payload}')" in command
+    assert "[Console]::Out.WriteLine('<<<END abc>>> ' + $__cisRc)" in command
+    assert "[Console]::Error.WriteLine('<<<END abc>>>')" in command
+    print("✅ Scripts are sent on one line with the marker on both streams")
+
+def test_read_until_marker():
+    """Test 8: _read_until splits output at the end marker"""
+    print_section("TEST 8: Reading Until The Marker")
+    
+    host = make_host()
+    marker = "<<<END abc>>>"
+    lines = queue.Queue()
+    for line in ("first\n", "second\n", "tail" + marker + " 0\n", "next command\n"):
+        lines.put(line)
+    
+    collected, status = host._read_until(lines, marker, time.monotonic() + 5)
+    assert collected == ["first\n", "second\n", "tail"]
+    assert status == "0"
+    assert lines.get_nowait() == "next command\n"
+    
+    # The reader thread signals a closed stream with None
+    lines.put(None)
+    try:
+        host._read_until(lines, marker, time.monotonic() + 5)
+        assert False, "expected RuntimeError"
+    except RuntimeError:
+        pass
+    
+    try:
+        host._read_until(queue.Queue(), marker, time.monotonic() + 0.05)
+        assert False, "expected TimeoutExpired"
+    except subprocess.TimeoutExpired:
+        pass
+    print("✅ Output is framed by the marker; exits and timeouts are raised")
+
+# =================================================================
+# AUDIT HISTORY INDEX
+# =================================================================
+
+def history_entry(audit_id: str, name: str):
+    """Minimal history line for an audit run"""
+    return {"audit_id": audit_id, "audit_name": name, "status": "completed",
+            "compliance_percentage": 50.0, "total_policies": 2, "failed_policies": 1}
+
+def test_history_index_tombstones():
+    """Test 9: the history index lists live runs newest first and hides deleted ones"""
+    print_section("TEST 9: History Index Tombstones")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(tmp)
+        try:
+            # An empty results directory builds an empty index
+            assert engine.get_audit_history() == []
+            assert os.path.exists(engine._history_index_path())
+            
+            for i in range(4):
+                engine._append_history_index(history_entry(f"run_{i}", f"Run {i}"))
+            assert [e["audit_id"] for e in engine.get_audit_history()] == ["run_3", "run_2", "run_1", "run_0"]
+            assert [e["audit_id"] for e in engine.get_audit_history(limit=2)] == ["run_3", "run_2"]
+            
+            assert engine.delete_audit_results("run_2")
+            assert [e["audit_id"] for e in engine.get_audit_history()] == ["run_3", "run_1", "run_0"]
+            
+            # A later save of the same run supersedes its earlier line
+            engine._append_history_index(history_entry("run_0", "Run 0 again"))
+            history = engine.get_audit_history()
+            assert [e["audit_id"] for e in history] == ["run_0", "run_3", "run_1"]
+            assert history[0]["audit_name"] == "Run 0 again"
+            
+            # A line torn by a crash is skipped and does not swallow the next one
+            with open(engine._history_index_path(), 'ab') as f:
+                f.write(b'{"audit_id": "torn"')
+            engine._append_history_index(history_entry("run_4", "Run 4"))
+            assert [e["audit_id"] for e in engine.get_audit_history()] == ["run_4", "run_0", "run_3", "run_1"]
+        finally:
+            close_engine(engine)
+    print("✅ Deleted and superseded runs are hidden from the history")
+
+def test_history_index_compaction():
+    """Test 10: tombstones are compacted away once enough accumulate"""
+    print_section("TEST 10: History Index Compaction")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(tmp)
+        engine.HISTORY_INDEX_COMPACT_EVERY = 2
+        try:
+            engine.get_audit_history()
+            for i in range(4):
+                engine._append_history_index(history_entry(f"run_{i}", f"Run {i}"))
+            
+            engine.delete_audit_results("run_1")
+            assert len(read_bytes(engine._history_index_path()).splitlines()) == 5
+            
+            engine.delete_audit_results("run_3")
+            lines = read_bytes(engine._history_index_path()).splitlines()
+            assert [loads_json(line)["audit_id"] for line in lines] == ["run_0", "run_2"]
+            assert engine._index_tombstones == 0
+            assert [e["audit_id"] for e in engine.get_audit_history()] == ["run_2", "run_0"]
+        finally:
+            close_engine(engine)
+    print("✅ Compaction keeps only the latest line of each live run")
+
+def test_history_index_rebuild():
+    """Test 11: a missing index is rebuilt from the saved results"""
+    print_section("TEST 11: History Index Rebuild")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(tmp)
+        try:
+            for i in range(3):
+                results = make_results(5)
+                run = AuditRun(audit_id=f"saved_{i}", configuration=AuditConfiguration(name=f"Saved {i}"),
+                               system_info=SYSTEM_INFO)
+                run.policy_results = results
+                run.summary = generate_audit_summary(results)
+                assert engine._save_audit_results(run, fsync=False)
+                time.sleep(0.01)
+            
+            history = engine.get_audit_history()
+            assert [e["audit_id"] for e in history] == ["saved_2", "saved_1", "saved_0"]
+            assert history[0]["audit_name"] == "Saved 2"
+            assert history[0]["total_policies"] == 5
+        finally:
+            close_engine(engine)
+    print("✅ The index is rebuilt from summary sidecars in save order")
+
+# =================================================================
+# STREAMING REPORT WRITERS
+# =================================================================
+
+def make_audit_run(count: int) -> AuditRun:
+    """Audit run with system information and a summary for report tests"""
+    results = make_results(count)
+    run = AuditRun(
+        audit_id="report-test",
+        configuration=AuditConfiguration(name="Report test", report_formats=[ReportFormat.JSON]),
+        system_info=SYSTEM_INFO
+    )
+    run.policy_results = results
+    run.summary = generate_audit_summary(results)
+    return run
+
+def test_json_report_matches_whole_document():
+    """Test 12: the streamed JSON report equals encoding the document at once"""
+    print_section("TEST 12: Streaming JSON Report")
+    
+    has_orjson = models_audit.HAS_ORJSON
+    backends = (True, False) if has_orjson else (False,)
+    try:
+        for use_orjson in backends:
+            models_audit.HAS_ORJSON = use_orjson
+            for count in (0, 1, 7):
+                run = make_audit_run(count)
+                report_data = {
+                    "report_info": {"audit_id": run.audit_id, "generated_at": datetime(2024, 1, 2).isoformat()},
+                    "system_info": run.system_info,
+                    "audit_configuration": run.configuration,
+                    "summary": run.summary,
+                    "empty": {},
+                    "missing": None,
+                }
+                out = io.BytesIO()
+                ReportGenerator._write_json_report(out, report_data, run.policy_results)
+                expected = dumps_json(dict(report_data, results=run.policy_results), indent=True)
+                assert out.getvalue() == expected, (use_orjson, count)
+    finally:
+        models_audit.HAS_ORJSON = has_orjson
+    print("✅ JSON reports are byte-identical with and without orjson")
+
+def test_csv_report_matches_reference():
+    """Test 13: the CSV report matches rows written one field at a time"""
+    print_section("TEST 13: Streaming CSV Report")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = ReportGenerator(tmp)
+        run = make_audit_run(20)
+        template = generator.templates["technical"]
+        path = generator._generate_csv_report(run, template, datetime(2024, 1, 2, 3, 4, 5))
+        assert os.path.basename(path) == "audit_report_report-test_20240102_030405.csv"
+        
+        expected = io.StringIO(newline='')
+        writer = csv.writer(expected)
+        writer.writerow(CSV_REPORT_HEADER)
+        for result in generator._filter_results(run.policy_results, template):
+            writer.writerow([
+                result.policy_id, result.policy_name, result.category, result.cis_level,
+                result.result.value, result.severity.value, result.current_value or '',
+                result.expected_value or '', result.registry_path or '', result.registry_key or '',
+                result.error_message or '', result.remediation or '', result.execution_time_ms
+            ])
+        
+        with open(path, newline='', encoding='utf-8') as f:
+            assert f.read() == expected.getvalue()
+    print("✅ CSV rows match the reference writer")
+
+# =================================================================
+# MODELS
+# =================================================================
+
+def test_hash_payload_is_backend_independent():
+    """Test 14: configuration and result hashes do not depend on orjson"""
+    print_section("TEST 14: Hash Payloads")
+    
+    if not models_audit.HAS_ORJSON:
+        print("⚠️  orjson not installed, skipping")
+        return
+    
+    run = make_audit_run(5)
+    try:
+        payloads = []
+        for use_orjson in (True, False):
+            models_audit.HAS_ORJSON = use_orjson
+            payloads.append([models_audit._hash_payload(obj)
+                             for obj in [run.configuration, run.system_info] + run.policy_results])
+        assert payloads[0] == payloads[1]
+    finally:
+        models_audit.HAS_ORJSON = True
+    print("✅ Both encoders produce the same canonical bytes")
+
+def test_audit_configuration_is_frozen():
+    """Test 15: configurations are immutable and store sequences as tuples"""
+    print_section("TEST 15: Frozen Configuration")
+    
+    config = AuditConfiguration(name="Frozen", policy_ids=["a", "b"], cis_levels=[1])
+    assert config.policy_ids == ("a", "b")
+    assert config.cis_levels == (1,)
+    assert hash(config) == hash(replace(config, policy_ids=("a", "b"), cis_levels=(1,)))
+    
+    try:
+        config.name = "Changed"
+        assert False, "expected FrozenInstanceError"
+    except AttributeError:
+        pass
+    print("✅ Configurations cannot be modified after creation")
+
+def test_validate_audit_summary():
+    """Test 16: summary validation catches counts and percentages that disagree"""
+    print_section("TEST 16: Summary Validation")
+    
+    results = make_results(10)
+    assert validate_audit_summary(generate_audit_summary(results)) == []
+    assert validate_audit_summary(AuditSummary()) == []
+    
+    summary = generate_audit_summary(results)
+    summary.failed_policies += 1
+    errors = validate_audit_summary(summary)
+    assert len(errors) == 1 and "Outcome counts" in errors[0]
+    
+    summary = generate_audit_summary(results)
+    summary.compliance_percentage += 1
+    errors = validate_audit_summary(summary)
+    assert len(errors) == 1 and "Compliance percentage" in errors[0]
+    
+    try:
+        summary.to_json_dict()
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    print("✅ Inconsistent summaries are rejected before serialization")
+
+# =================================================================
+# AUDIT RUN LIFECYCLE
+# =================================================================
+
+def sample_policies(count: int):
+    """Policy dictionaries as the dashboard hands them to the engine"""
+    return [
+        {"policy_id": f"policy_{i}", "policy_name": f"Policy {i}", "category": f"Category {i % 2}",
+         "cis_level": 1 + i % 2, "description": "Sample policy", "registry_path": "HKLM\\SOFTWARE\\Test",
+         "required_value": "1"}
+        for i in range(count)
+    ]
+
+def test_report_paths_survive_reload():
+    """Test 17: report paths stay on a run after its results are reloaded from disk"""
+    print_section("TEST 17: Report Paths After Reload")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(tmp)
+        try:
+            config = AuditConfiguration(name="Reports", parallel_execution=False,
+                                        report_formats=[ReportFormat.HTML])
+            audit_id = engine.start_audit(config, sample_policies(3))
+            engine.await_audit(audit_id, timeout=60)
+            
+            # Only the weakly referenced full run is dropped; the status shell stays cached
+            gc.collect()
+            expected = {"json", "html"}
+            assert set(engine.get_audit_status(audit_id).report_paths) == expected
+            
+            reloaded = engine.get_audit_run(audit_id)
+            assert len(reloaded.policy_results) == 3
+            assert set(reloaded.report_paths) == expected
+            assert reloaded.report_generated
+            assert set(engine.get_audit_status(audit_id).report_paths) == expected
+            
+            del reloaded
+            gc.collect()
+            assert set(engine.await_audit(audit_id).report_paths) == expected
+        finally:
+            close_engine(engine)
+    print("✅ Reloading results keeps the recorded report paths")
+
+# =================================================================
+# AUDIT MANAGER
+# =================================================================
+
+def make_manager(data_dir: str) -> AuditManager:
+    """Create a manager whose log handlers can be closed after the test"""
+    return AuditManager(data_dir)
+
+def close_manager(manager: AuditManager):
+    """Stop the manager's engine and release its log files"""
+    close_engine(manager.audit_engine)
+    for handler in list(manager.logger.handlers):
+        manager.logger.removeHandler(handler)
+        handler.close()
+
+def test_compliance_trends_and_statistics():
+    """Test 18: trend direction and score statistics over the audit history"""
+    print_section("TEST 18: Compliance Trends And Statistics")
+    
+    now = datetime.now()
+    scores = [40.0, 50.0, 45.0, 80.0, 90.0, 85.0]
+    # History is listed newest first
+    history = [
+        {"audit_id": f"run_{i}", "end_time": (now - timedelta(hours=len(scores) - i)).isoformat(),
+         "compliance_percentage": score, "total_policies": 10, "failed_policies": 2}
+        for i, score in reversed(list(enumerate(scores)))
+    ]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = make_manager(tmp)
+        try:
+            trends = manager.get_compliance_trends(days=30, history=history)
+            assert trends["compliance_scores"] == scores
+            assert trends["trend_direction"] == "improving"
+            
+            declining = [dict(h, compliance_percentage=100.0 - h["compliance_percentage"]) for h in history]
+            assert manager.get_compliance_trends(history=declining)["trend_direction"] == "declining"
+            assert manager.get_compliance_trends(history=history[:2])["trend_direction"] == "insufficient_data"
+            
+            manager.get_audit_history = lambda limit=50: history
+            stats = manager.get_audit_statistics()
+            assert stats["total_audits"] == 6
+            assert stats["average_compliance"] == sum(scores) / len(scores)
+            assert stats["best_compliance"] == 90.0
+            assert stats["worst_compliance"] == 40.0
+            assert stats["total_policies_audited"] == 60
+            assert stats["trend_direction"] == "improving"
+        finally:
+            close_manager(manager)
+    print("✅ Trends and statistics are computed from plain score lists")
+
+def test_group_commit_flushes_only_its_files():
+    """Test 19: a group commit fsyncs each saved file and never the whole system"""
+    print_section("TEST 19: Group Commit Durability")
+    
+    synced = []
+    real_fsync = storage.os.fsync
+    real_sync = getattr(storage.os, "sync", None)
+    
+    def record_fsync(fd):
+        synced.append(os.fstat(fd).st_mode)
+        real_fsync(fd)
+    
+    def forbid_sync():
+        raise AssertionError("os.sync() flushes every mounted filesystem")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        storage.os.fsync = record_fsync
+        storage.os.sync = forbid_sync
+        try:
+            batch = []
+            for i in range(3):
+                pending = []
+                with atomic_write(os.path.join(tmp, f"save_{i}.json"), pending=pending) as f:
+                    f.write(b"{}")
+                batch.append((pending, Future()))
+            GroupCommitWriter._commit_batch(batch)
+        finally:
+            storage.os.fsync = real_fsync
+            if real_sync is None:
+                del storage.os.sync
+            else:
+                storage.os.sync = real_sync
+        
+        for _, future in batch:
+            assert future.result(timeout=0) is None
+        # One flush per saved file, plus one for the shared directory where supported
+        files = [mode for mode in synced if stat.S_ISREG(mode)]
+        directories = [mode for mode in synced if stat.S_ISDIR(mode)]
+        assert len(files) == 3
+        assert len(directories) == (1 if hasattr(os, "O_DIRECTORY") else 0)
+    print("✅ Each file in the group is flushed and the directory once")
+
+def test_loaded_runs_are_verified():
+    """Test 20: runs loaded from disk are checked against their recorded hashes"""
+    print_section("TEST 20: Integrity Hashes On Load")
+    
+    run = make_audit_run(6)
+    run.update_hashes()
+    empty_hash = AuditRun(audit_id="empty", configuration=run.configuration, system_info=SYSTEM_INFO).results_hash
+    assert run.results_hash != empty_hash
+    
+    data = loads_json(dumps_json(run))
+    restored = deserialize_audit_run(data)
+    assert (restored.config_hash, restored.results_hash) == (run.config_hash, run.results_hash)
+    
+    # A changed result or configuration no longer matches the recorded hashes
+    for section, key, value in (("policy_results", "current_value", "0"), ("configuration", "name", "Edited")):
+        tampered = loads_json(dumps_json(run))
+        target = tampered[section][0] if section == "policy_results" else tampered[section]
+        target[key] = value
+        try:
+            deserialize_audit_run(tampered)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(tmp)
+        try:
+            audit_id = engine.start_audit(AuditConfiguration(name="Hashes", parallel_execution=False),
+                                          sample_policies(2))
+            finished = engine.await_audit(audit_id, timeout=60)
+            assert finished.results_hash != empty_hash
+            
+            results_file = os.path.join(tmp, "results", f"audit_{audit_id}.json")
+            data = loads_json(read_bytes(results_file))
+            assert deserialize_audit_run(data).results_hash == data["results_hash"]
+            
+            # A corrupted results file is reported instead of loading silently
+            data["policy_results"][0]["result"] = "pass" if data["policy_results"][0]["result"] != "pass" else "fail"
+            with open(results_file, 'wb') as f:
+                f.write(dumps_json(data))
+            assert engine._load_audit_results(audit_id) is None
+        finally:
+            close_engine(engine)
+    print("✅ Altered results files fail the integrity check")
+
+def test_finished_run_builds_requested_reports():
+    """Test 21: a finished run writes its JSON report plus every requested format"""
+    print_section("TEST 21: Reports For A Finished Run")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(tmp)
+        try:
+            formats = [ReportFormat.HTML, ReportFormat.CSV, ReportFormat.PDF, ReportFormat.JSON]
+            config = AuditConfiguration(name="All formats", parallel_execution=False, report_formats=formats)
+            audit_id = engine.start_audit(config, sample_policies(4))
+            paths = engine.await_audit(audit_id, timeout=60).report_paths
+            
+            assert set(paths) == {"json", "html", "csv", "pdf"}
+            assert all(os.path.dirname(path) == os.path.join(tmp, "reports") for path in paths.values())
+            assert loads_json(read_bytes(paths["json"]))["audit_id"] == audit_id
+            assert paths["html"].endswith(".html") and audit_id in read_bytes(paths["html"]).decode("utf-8")
+            with open(paths["csv"], newline='', encoding='utf-8') as f:
+                assert tuple(next(csv.reader(f))) == CSV_REPORT_HEADER
+            # PDF output is still the HTML report it falls back to
+            assert paths["pdf"].endswith(".html") and os.path.exists(paths["pdf"])
+            
+            # Runs that do not ask for reports write none
+            config = AuditConfiguration(name="No reports", parallel_execution=False, generate_report=False)
+            audit_id = engine.start_audit(config, sample_policies(2))
+            assert engine.await_audit(audit_id, timeout=60).report_paths == {}
+            assert not [name for name in os.listdir(os.path.join(tmp, "reports")) if audit_id in name]
+        finally:
+            close_engine(engine)
+    print("✅ Every requested format is written and recorded on the run")
+
+# =================================================================
+# POLICY AUDITS
+# =================================================================
+
+def test_audit_method_names():
+    """Test 22: rules are dispatched on their exact audit_method name"""
+    print_section("TEST 22: Audit Method Names")
+    
+    ps_config = PowerShellHostConfig(available=False)
+    policy = {"policy_id": "uac_admin", "policy_name": "UAC admin approval"}
+    registry_rule = {"registry_path": "HKLM\\SOFTWARE\\Test", "registry_key": "Enabled", "expected_value": "1"}
+    outcomes = {}
+    for method in ("registry", "registry_direct", "file_system"):
+        rules = {"uac": dict(registry_rule, audit_method=method)}
+        outcomes[method] = audit_policy(policy, rules, ps_config, rule_index=AuditRuleIndex(rules))
+    
+    # "registry" is not an AuditMethod value, so those rules fail as they always have
+    assert outcomes["registry"].result is ComplianceResult.ERROR
+    assert "not a valid AuditMethod" in outcomes["registry"].error_message
+    
+    direct = outcomes["registry_direct"]
+    assert direct.audit_method is AuditMethod.REGISTRY_DIRECT
+    if platform.system() != "Windows":
+        assert direct.result is ComplianceResult.NOT_APPLICABLE
+    
+    assert outcomes["file_system"].result is ComplianceResult.ERROR
+    assert outcomes["file_system"].error_message == "Unsupported audit method: file_system"
+    print("✅ Only rules naming a known audit method are executed")
+
+def test_expected_value_comparisons():
+    """Test 23: compiled rules compare expected values without changing the rule"""
+    print_section("TEST 23: Expected Value Comparisons")
+    
+    # Command output matches as the baseline did: a case-insensitive substring, whitespace included
+    rule = {"audit_method": "powershell", "powershell_command": "Get-Thing", "expected_value": "Enabled "}
+    compiled = _compile_audit_rule(rule)
+    assert rule == {"audit_method": "powershell", "powershell_command": "Get-Thing", "expected_value": "Enabled "}
+    assert compiled.method is AuditMethod.POWERSHELL
+    assert _output_contains_expected(compiled, "State: ENABLED True")
+    assert not _output_contains_expected(compiled, "State: Enabled")
+    assert not _output_contains_expected(_compile_audit_rule({"expected_value": ""}), "anything")
+    
+    # Registry rules with an integer expectation compare numerically
+    registry_rule = {"audit_method": "registry_direct", "expected_value": "1"}
+    compiled = _compile_audit_rule(registry_rule)
+    assert compiled.expected_int == 1
+    assert _registry_value_matches(1, "1", registry_rule, compiled)
+    assert _registry_value_matches(None, "01", registry_rule, compiled)
+    assert not _registry_value_matches(10, "10", registry_rule, compiled)
+    assert not _registry_value_matches(None, "", registry_rule, compiled)
+    
+    # DWORD data also matches a hexadecimal expectation; other values compare as exact strings
+    hex_rule = {"audit_method": "registry_direct", "expected_value": "0x10"}
+    assert _registry_value_matches(16, "16", hex_rule, _compile_audit_rule(hex_rule))
+    text_rule = {"audit_method": "registry_direct", "expected_value": "Allow"}
+    assert _registry_value_matches(None, "Allow", text_rule, _compile_audit_rule(text_rule))
+    assert not _registry_value_matches(None, "allow", text_rule, _compile_audit_rule(text_rule))
+    
+    # Loaded rules stay plain definitions; their compiled forms live in the index
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(tmp)
+        try:
+            for name, rule in engine.audit_rules.items():
+                assert not [key for key in rule if key.startswith('_')], name
+            index = engine._rule_index
+            assert len(index.compiled) == len(engine.audit_rules)
+            rule, compiled = index.match_compiled({"policy_id": "account_lockout_1", "policy_name": "Lockout"})
+            assert rule is engine.audit_rules["account_lockout"]
+            assert compiled.method is AuditMethod.POWERSHELL and compiled.expected_lower == "5"
+        finally:
+            close_engine(engine)
+    print("✅ Comparisons follow the documented semantics and rules are never mutated")
+
+def save_completed_run(engine: WindowsAuditEngine, audit_id: str, results) -> AuditRun:
+    """Persist a finished run the way the engine does once an audit completes"""
+    run = AuditRun(audit_id=audit_id, configuration=AuditConfiguration(name=f"Run {audit_id}"),
+                   system_info=SYSTEM_INFO, status=AuditStatus.COMPLETED, end_time=datetime.now())
+    run.policy_results = results
+    run.update_hashes()
+    run.summary = generate_audit_summary(results)
+    assert engine._save_audit_results(run, fsync=False)
+    return run
+
+def test_search_bounds_disk_reads():
+    """Test 24: a history-wide search reads a bounded number of results files"""
+    print_section("TEST 24: Search Disk Reads")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = make_manager(tmp)
+        engine = manager.audit_engine
+        manager.SEARCH_MAX_DISK_LOADS = 2
+        try:
+            audit_ids = [f"search_{i}" for i in range(5)]
+            for audit_id in audit_ids:
+                save_completed_run(engine, audit_id, make_results(6))
+            engine.get_audit_history()
+            gc.collect()
+            
+            loads = []
+            load_audit_results = engine._load_audit_results
+            engine._load_audit_results = lambda audit_id: loads.append(audit_id) or load_audit_results(audit_id)
+            
+            hits = manager.search_audit_results("policy <1>")
+            assert loads == ["search_4", "search_3"]
+            assert [hit["audit_id"] for hit in hits] == ["search_4", "search_3"]
+            assert hits[0] == {
+                "audit_id": "search_4", "audit_name": "Run search_4",
+                "audit_date": hits[0]["audit_date"], "policy_id": "policy_1",
+                "policy_name": 'Policy <1> "Ñame"', "category": "Category 1",
+                "result": "fail", "severity": "high", "error_message": None,
+                "remediation": "Set the value to 1"
+            }
+            
+            # Searched audits are answered from the cache, so the next search reads two more
+            gc.collect()
+            hits = manager.search_audit_results(["policy <1>", "policy <2>"])
+            assert loads[2:] == ["search_2", "search_1"]
+            assert {hit["audit_id"] for hit in hits} == set(audit_ids[1:])
+            
+            # Outcome filters apply to cached audits as well
+            hits = manager.search_audit_results("category", result_types=[ComplianceResult.PASS])
+            assert hits and all(hit["result"] == "pass" for hit in hits)
+            
+            # Explicitly requested audits are always read
+            hits = manager.search_audit_results("policy <1>", audit_ids=["search_0"])
+            assert loads[-1] == "search_0" and [hit["audit_id"] for hit in hits] == ["search_0"]
+        finally:
+            close_manager(manager)
+    print("✅ Searches reuse cached audits and read few results files")
+
+# =================================================================
+# REPORT FORMAT HANDLERS
+# =================================================================
+
+def test_report_format_handlers():
+    """Test 25: built-in and registered report builders are looked up by format"""
+    print_section("TEST 25: Report Format Handlers")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = ReportGenerator(tmp)
+        assert set(generator._format_handlers) == set(ReportFormat)
+        
+        calls = []
+        def build_text(audit_run, template, now=None):
+            calls.append((audit_run.audit_id, template.name))
+            return os.path.join(tmp, f"{audit_run.audit_id}.txt")
+        
+        generator.register_format_handler(ReportFormat.CSV, build_text)
+        run = make_audit_run(2)
+        assert generator.generate_report(run, ReportFormat.CSV) == os.path.join(tmp, "report-test.txt")
+        assert calls == [("report-test", "Standard CIS Audit Report")]
+        # Other formats keep their built-in builders
+        assert generator.generate_report(run, ReportFormat.JSON).endswith(".json")
+        
+        try:
+            generator.generate_report(run, "xml")
+            assert False, "unknown formats must be rejected"
+        except ValueError:
+            pass
+    
+    print("✅ Report builders registered by format")
+
+# =================================================================
+# AUDIT EXECUTION
+# =================================================================
+
+def test_policy_result_cache_follows_policy_state():
+    """Test 26: cached policy results are dropped when the policy exports change or on request"""
+    print_section("TEST 26: Policy Result Cache Invalidation")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(tmp)
+        try:
+            exports = {"secedit": "MinimumPasswordLength = 8"}
+            audited = []
+            
+            def load_snapshots(policies):
+                return {kind: PolicySnapshot(raw=raw, values={}) for kind, raw in exports.items()}
+            
+            def audit(policy, audit_rules, prefetched=None, snapshots=None):
+                audited.append(policy["policy_id"])
+                return PolicyAuditResult(
+                    policy_id=policy["policy_id"], policy_name=policy["policy_name"], policy_title="",
+                    category="", cis_level=1, description="", result=ComplianceResult.PASS,
+                    severity=AuditSeverity.LOW
+                )
+            
+            engine._load_policy_snapshots = load_snapshots
+            engine.audit_policy = audit
+            
+            def run(use_cache=True):
+                del audited[:]
+                config = AuditConfiguration(name="Cache", parallel_execution=False, generate_report=False)
+                audit_id = engine.start_audit(config, sample_policies(2), use_cache=use_cache)
+                assert engine.await_audit(audit_id, timeout=60).status is AuditStatus.COMPLETED
+                return sorted(audited)
+            
+            assert run() == ["policy_0", "policy_1"]
+            assert run() == []
+            
+            # Fixing a setting changes the export, so nothing is served from the cache
+            exports["secedit"] = "MinimumPasswordLength = 14"
+            assert run() == ["policy_0", "policy_1"]
+            assert run() == []
+            
+            # Registry fixes leave the exports alone; a rerun can skip the cache
+            assert run(use_cache=False) == ["policy_0", "policy_1"]
+        finally:
+            close_engine(engine)
+    
+    print("✅ Cached results follow the policy exports and can be bypassed")
+
+BATCH_RULES = {
+    "reg_rule": {"audit_method": "registry_direct", "registry_path": "HKLM\\SOFTWARE\\Test",
+                 "registry_key": "Value", "expected_value": "1"},
+    "wmi_rule": {"audit_method": "wmi", "wmi_query": "SELECT Caption FROM Win32_OperatingSystem",
+                 "expected_value": "Windows"},
+    "ps_rule": {"audit_method": "powershell", "powershell_command": "Get-Date"},
+}
+
+def test_batch_script_and_prefetch():
+    """Test 27: registry and WMI rules are batched in order, once per policy, and prefetched"""
+    print_section("TEST 27: Batched Registry And WMI Queries")
+    
+    policies = [{"policy_id": policy_id} for policy_id in
+                ("wmi_rule_1", "reg_rule_1", "ps_rule_1", "reg_rule_1", "wmi_rule_2", "unmatched")]
+    for rule_index in (None, AuditRuleIndex(BATCH_RULES)):
+        script, batched_ids = _build_batch_script(policies, BATCH_RULES, rule_index)
+        # Policy order is kept, duplicates and PowerShell rules are left out
+        assert batched_ids == ["wmi_rule_1", "reg_rule_1", "wmi_rule_2"]
+        assert script.count("Get-ItemProperty -Path 'Registry::HKLM\\SOFTWARE\\Test' -Name 'Value'") == 1
+        # Both WMI policies share one query
+        assert script.count("Get-WmiObject") == 1
+        assert "$r['wmi_rule_1'] = $w0" in script and "$r['wmi_rule_2'] = $w0" in script
+        assert script.endswith("$r | ConvertTo-Json -Compress")
+    
+    assert _build_batch_script([{"policy_id": "ps_rule_1"}], BATCH_RULES) == (None, [])
+    
+    class BatchHost:
+        def __init__(self, returncode, stdout):
+            self.returncode, self.stdout = returncode, stdout
+        
+        def run(self, script, timeout=None):
+            return self.returncode, self.stdout, "failed"
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(tmp)
+        original_host = audit_engine_module.get_thread_host
+        try:
+            engine.audit_rules = dict(BATCH_RULES)
+            engine.__dict__["powershell_available"] = True
+            run = AuditRun(audit_id="batch", configuration=AuditConfiguration(batch_size=2),
+                           system_info=SYSTEM_INFO)
+            
+            host = BatchHost(0, '{"wmi_rule_1": "Windows 10", "reg_rule_1": 1}')
+            audit_engine_module.get_thread_host = lambda *args: host
+            prefetched = engine._prefetch_audit_batches(run, policies)
+            assert prefetched == {"wmi_rule_1": "Windows 10", "reg_rule_1": "1"}
+            assert engine._prefetched_for(prefetched, {"policy_id": "reg_rule_1"}) == {"reg_rule_1": "1"}
+            assert engine._prefetched_for(prefetched, {"policy_id": "wmi_rule_2"}) is None
+            
+            # A failed batch leaves its policies to be audited individually
+            host = BatchHost(1, "")
+            assert engine._prefetch_audit_batches(run, policies) == {}
+        finally:
+            audit_engine_module.get_thread_host = original_host
+            close_engine(engine)
+    
+    print("✅ Batched queries keep policy order and fall back on failure")
+
+def test_process_pool_matches_thread_pool():
+    """Test 28: worker processes audit the same policies with the same outcomes as threads"""
+    print_section("TEST 28: Process Pool Audits")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(tmp)
+        try:
+            outcomes = []
+            for use_processes in (False, True):
+                config = AuditConfiguration(name="Pool", max_workers=2, use_processes=use_processes,
+                                            generate_report=False)
+                audit_id = engine.start_audit(config, sample_policies(5), use_cache=False)
+                run = engine.await_audit(audit_id, timeout=120)
+                assert run.status is AuditStatus.COMPLETED
+                outcomes.append(sorted((result.policy_id, result.result) for result in run.policy_results))
+            
+            assert [policy_id for policy_id, _ in outcomes[1]] == [f"policy_{i}" for i in range(5)]
+            assert outcomes[0] == outcomes[1]
+        finally:
+            close_engine(engine)
+    
+    print("✅ Process pool results match the thread pool")
+
+# =================================================================
+# POWERSHELL HOST SCRIPTBLOCKS
+# =================================================================
+
+def test_scriptblocks_defined_once():
+    """Test 29: concurrent callers define a host scriptblock once, under the run lock"""
+    print_section("TEST 29: Scriptblock Definitions")
+    
+    host = make_host()
+    host._lock = threading.Lock()
+    host._scriptblocks = set()
+    definitions = []
+    returncodes = [1, 0]
+    
+    def run_locked(script, timeout):
+        assert host._lock.locked()
+        definitions.append(script)
+        time.sleep(0.01)
+        return returncodes.pop(0) if returncodes else 0, "", "not defined"
+    
+    host._run_locked = run_locked
+    
+    # A failed definition is not remembered and is tried again
+    try:
+        host.ensure_scriptblock("CisTest", "function CisTest {}")
+        assert False, "failed definitions must raise"
+    except RuntimeError:
+        pass
+    assert "CisTest" not in host._scriptblocks
+    
+    threads = [threading.Thread(target=host.ensure_scriptblock, args=("CisTest", "function CisTest {}"))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert definitions == ["function CisTest {}"] * 2
+    assert host.run("Get-Date") == (0, "", "not defined")
+    print("✅ Scriptblocks are defined once per host")
+
+# =================================================================
+# POLICY SNAPSHOTS AND RULE MATCHING
+# =================================================================
+
+SECEDIT_EXPORT = """[Unicode]
+Unicode=yes
+[System Access]
+; comment = ignored
+MinimumPasswordLength = 14
+PasswordComplexity = 1
+MinimumPasswordLength = 8
+[Registry Values]
+MACHINE\\System\\Setting=4,1,=2
+"""
+
+AUDITPOL_EXPORT = """Machine Name,Policy Target,Subcategory,Subcategory GUID,Inclusion Setting,Exclusion Setting
+HOST,System,Security State Change,{0CCE9210-69AE-11D9-BED3-505054503030},Success,
+HOST,System,Logon, {0CCE9215-69AE-11D9-BED3-505054503030},Success and Failure,
+"""
+
+def test_policy_snapshot_parsing():
+    """Test 30: secedit and auditpol exports answer policy commands"""
+    print_section("TEST 30: Policy Snapshots")
+    
+    secedit = _SNAPSHOT_PARSERS["secedit"](SECEDIT_EXPORT)
+    # Sections and comments are skipped; the first occurrence of a setting wins
+    assert secedit == {"Unicode": "yes", "MinimumPasswordLength": "14", "PasswordComplexity": "1",
+                       "MACHINE\\System\\Setting": "4,1,=2"}
+    
+    auditpol = _SNAPSHOT_PARSERS["auditpol"](AUDITPOL_EXPORT)
+    assert auditpol == {"Security State Change": "Success", "Logon": "Success and Failure"}
+    assert _SNAPSHOT_PARSERS["auditpol"]("") == {}
+    
+    assert _snapshot_kind("  SECEDIT /export /cfg C:\\x.inf") == "secedit"
+    assert _snapshot_kind("auditpol /get /category:* /r") == "auditpol"
+    assert _snapshot_kind("auditpol /get /subcategory:Logon") is None
+    assert _snapshot_kind("Get-Date") is None
+    
+    snapshot = PolicySnapshot(raw=AUDITPOL_EXPORT.strip(), values=auditpol)
+    assert snapshot.lookup(None) == (0, AUDITPOL_EXPORT.strip(), '')
+    assert snapshot.lookup("Logon") == (0, "Success and Failure", '')
+    returncode, stdout, stderr = snapshot.lookup("Missing")
+    assert (returncode, stdout) == (1, '') and "Missing" in stderr
+    
+    print("✅ Policy exports parse into per-setting answers")
+
+class ScanAutomaton:
+    """Stand-in for a pyahocorasick automaton, reporting matches last key first"""
+    
+    def __init__(self, rule_keys_lower):
+        self.rule_keys_lower = [(key, position) for key, position in rule_keys_lower if key]
+    
+    def iter(self, text):
+        for key, position in reversed(self.rule_keys_lower):
+            start = text.find(key)
+            while start >= 0:
+                yield start + len(key) - 1, position
+                start = text.find(key, start + 1)
+
+def test_rule_index_first_match():
+    """Test 31: the rule index returns the first rule defined among all matching keys"""
+    print_section("TEST 31: Audit Rule Index Order")
+    
+    rules = {
+        "password": {"audit_method": "powershell", "powershell_command": "first"},
+        "Password_Length": {"audit_method": "registry_direct", "expected_value": "14"},
+        "lockout": {"audit_method": "wmi"},
+    }
+    policies = [
+        {"policy_id": "minimum_password_length"},
+        {"policy_id": "x", "name": "Account LOCKOUT threshold"},
+        {"policy_id": "x", "policy_name": "y", "tags": ["Password_length"]},
+        {"policy_id": "pass", "name": "word"},
+        {"policy_id": "firewall"},
+    ]
+    expected = [rules["password"], rules["lockout"], rules["password"], None, None]
+    
+    for use_automaton in (False, True):
+        index = AuditRuleIndex(rules)
+        index.automaton = ScanAutomaton(index.rule_keys_lower) if use_automaton else None
+        assert [index.match(policy) for policy in policies] == expected
+        
+        rule, compiled = index.match_compiled(policies[0])
+        assert rule is rules["password"] and compiled.method is AuditMethod.POWERSHELL
+        assert index.match_compiled(policies[4]) == (None, None)
+        
+        # Later keys match when earlier ones do not
+        assert index.match({"policy_id": "password_length_only"}) is rules["password"]
+        assert index.match({"policy_id": "passwor_length"}) is None
+    
+    # An empty key matches every policy, in its defined position
+    index = AuditRuleIndex({"lockout": rules["lockout"], "": rules["password"]})
+    for automaton in (None, ScanAutomaton(index.rule_keys_lower)):
+        index.automaton = automaton
+        assert index.match({"policy_id": "lockout"}) is rules["lockout"]
+        assert index.match({"policy_id": "firewall"}) is rules["password"]
+    
+    print("✅ First defined rule wins with and without the automaton")
+
+def baseline_filter_policies(policies, config):
+    """The list-based policy filter _filter_policies replaced"""
+    filtered = policies.copy()
+    if config.scope == AuditScope.SELECTED_POLICIES and config.policy_ids:
+        filtered = [p for p in filtered if p.get('id', p.get('policy_id', '')) in config.policy_ids]
+    elif config.scope == AuditScope.POLICY_GROUP and config.group_names:
+        filtered = [p for p in filtered if any(group in p.get('group_names', []) for group in config.group_names)]
+    elif config.scope == AuditScope.CIS_LEVEL and config.cis_levels:
+        filtered = [p for p in filtered if p.get('cis_level', 1) in config.cis_levels]
+    if config.categories:
+        filtered = [p for p in filtered if p.get('category', '') in config.categories]
+    return filtered
+
+def test_filter_policies_matches_reference():
+    """Test 32: single-pass policy filtering keeps the same policies in the same order"""
+    print_section("TEST 32: Policy Filtering")
+    
+    policies = sample_policies(12)
+    for i, policy in enumerate(policies):
+        policy["group_names"] = [f"group_{i % 3}"] if i % 4 else []
+        if i % 5 == 0:
+            policy["id"] = f"alias_{i}"
+    policies.append({"policy_id": "bare"})
+    
+    configs = [
+        AuditConfiguration(),
+        AuditConfiguration(scope=AuditScope.SELECTED_POLICIES, policy_ids=["policy_1", "alias_5", "bare", "none"]),
+        AuditConfiguration(scope=AuditScope.SELECTED_POLICIES),
+        AuditConfiguration(scope=AuditScope.POLICY_GROUP, group_names=["group_1", "group_2"]),
+        AuditConfiguration(scope=AuditScope.CIS_LEVEL, cis_levels=[2]),
+        AuditConfiguration(scope=AuditScope.CIS_LEVEL, cis_levels=[1], categories=["Category 0"]),
+        AuditConfiguration(scope=AuditScope.POLICY_GROUP, group_names=["group_0"], categories=["Category 1", ""]),
+        AuditConfiguration(categories=["Category 1"]),
+    ]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(tmp)
+        try:
+            for config in configs:
+                filtered = engine._filter_policies(policies, config)
+                assert filtered == baseline_filter_policies(policies, config), config
+                assert filtered is not policies
+        finally:
+            close_engine(engine)
+    
+    print("✅ Filtered policies match the list-based filter")
+
+# =================================================================
+# AUDIT COMPARISON AND CONFIGURATIONS
+# =================================================================
+
+def comparison_result(policy_id: str, outcome: ComplianceResult) -> PolicyAuditResult:
+    """Policy result carrying only what an audit comparison reads"""
+    return PolicyAuditResult(policy_id=policy_id, policy_name=f"Name {policy_id}", policy_title="",
+                             category="", cis_level=1, description="", result=outcome,
+                             severity=AuditSeverity.MEDIUM)
+
+def test_compare_audits_classifies_changes():
+    """Test 33: comparing two audits sorts shared policies into improved, degraded and unchanged"""
+    print_section("TEST 33: Audit Comparison")
+    
+    PASS, FAIL, ERROR = ComplianceResult.PASS, ComplianceResult.FAIL, ComplianceResult.ERROR
+    before = {"fixed": FAIL, "broken": PASS, "same": PASS, "errored": FAIL, "recovered": ERROR, "gone": FAIL}
+    after = {"fixed": PASS, "broken": FAIL, "same": PASS, "errored": ERROR, "recovered": PASS, "new": FAIL}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = make_manager(tmp)
+        try:
+            for audit_id, outcomes in (("before", before), ("after", after)):
+                save_completed_run(manager.audit_engine, audit_id,
+                                   [comparison_result(policy_id, outcome) for policy_id, outcome in outcomes.items()])
+            
+            comparison = manager.compare_audits("before", "after")
+            assert comparison["audit1"]["id"] == "before" and comparison["audit2"]["name"] == "Run after"
+            assert comparison["comparison"] == {
+                "common_policies": 5, "improved_policies": 1, "degraded_policies": 1,
+                "unchanged_policies": 3,
+                "compliance_change": (comparison["audit2"]["compliance"] - comparison["audit1"]["compliance"])
+            }
+            assert comparison["details"]["improved"] == [
+                {"policy_id": "fixed", "policy_name": "Name fixed", "previous": "fail", "current": "pass"}
+            ]
+            assert comparison["details"]["degraded"] == [
+                {"policy_id": "broken", "policy_name": "Name broken", "previous": "pass", "current": "fail"}
+            ]
+            # Only a fail/pass flip counts as a change; other transitions report the earlier result
+            assert comparison["details"]["unchanged"] == [
+                {"policy_id": "same", "policy_name": "Name same", "result": "pass"},
+                {"policy_id": "errored", "policy_name": "Name errored", "result": "fail"},
+                {"policy_id": "recovered", "policy_name": "Name recovered", "result": "error"},
+            ]
+            
+            assert "error" in manager.compare_audits("before", "missing")
+        finally:
+            close_manager(manager)
+    
+    print("✅ Shared policies are classified by their transition")
+
+def test_configuration_log_replay_and_compaction():
+    """Test 34: configuration changes are appended, replayed on load and folded into the snapshot"""
+    print_section("TEST 34: Configuration Log")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = make_manager(tmp)
+        try:
+            manager.CONFIG_LOG_COMPACT_EVERY = 3
+            first = manager.create_audit_configuration("First", policy_ids=["a"])
+            second = manager.create_audit_configuration("Second")
+            assert not os.path.exists(manager._configs_path)
+            assert len(read_bytes(manager._config_log_path).splitlines()) == 2
+            
+            # The third entry reaches the threshold and is folded into the snapshot
+            third = manager.create_audit_configuration("Third")
+            assert not os.path.exists(manager._config_log_path)
+            snapshot = loads_json(read_bytes(manager._configs_path))
+            assert set(snapshot) == {first.audit_id, second.audit_id, third.audit_id}
+            assert snapshot[first.audit_id]["policy_ids"] == ["a"]
+            
+            # A later change overrides the snapshot when the log is replayed
+            with manager._config_lock:
+                manager.configuration_cache[second.audit_id] = replace(second, name="Second, renamed")
+                manager._dirty_config_ids.add(second.audit_id)
+            manager._save_configurations()
+            fourth = manager.create_audit_configuration("Fourth")
+        finally:
+            close_manager(manager)
+        
+        # A save cut short leaves a torn final line
+        with open(os.path.join(tmp, "configurations.jsonl"), 'ab') as f:
+            f.write(b'{"torn": {"name": "Tor')
+        
+        manager = make_manager(tmp)
+        try:
+            configs = manager.configuration_cache
+            assert set(configs) == {first.audit_id, second.audit_id, third.audit_id, fourth.audit_id}
+            assert configs[second.audit_id]["name"] == "Second, renamed"
+            assert configs[fourth.audit_id]["name"] == "Fourth"
+            assert manager._config_log_entries == 2
+            assert read_bytes(manager._config_log_path).endswith(b"\n")
+        finally:
+            close_manager(manager)
+    
+    print("✅ Configurations survive appends, compaction and a torn entry")
+
+# =================================================================
+# PER-THREAD POWERSHELL HOSTS
+# =================================================================
+
+def test_thread_hosts_are_reused_and_reaped():
+    """Test 35: each thread keeps one host until it dies, is released or its thread exits"""
+    print_section("TEST 35: Per-Thread PowerShell Hosts")
+    
+    class FakeHost:
+        def __init__(self, executable):
+            self.executable = executable
+            self.alive = True
+        
+        def is_alive(self):
+            return self.alive
+        
+        def close(self):
+            self.alive = False
+    
+    original_host = powershell_host.PowerShellHost
+    powershell_host.PowerShellHost = FakeHost
+    try:
+        host = get_thread_host("pwsh")
+        assert get_thread_host("pwsh") is host and host.executable == "pwsh"
+        
+        # A host whose process died is replaced on the next call
+        host.alive = False
+        replacement = get_thread_host("pwsh")
+        assert replacement is not host and replacement.is_alive()
+        
+        worker_hosts = []
+        workers = [threading.Thread(target=lambda: worker_hosts.append(get_thread_host())) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert len({id(worker_host) for worker_host in worker_hosts}) == 3
+        assert all(worker_host.is_alive() for worker_host in worker_hosts)
+        
+        # Hosts of exited threads are closed; the calling thread keeps its own
+        reap_thread_hosts()
+        assert not any(worker_host.is_alive() for worker_host in worker_hosts)
+        assert replacement.is_alive() and get_thread_host() is replacement
+        
+        release_thread_host()
+        assert not replacement.is_alive()
+        assert get_thread_host() is not replacement
+        release_thread_host()
+    finally:
+        powershell_host.PowerShellHost = original_host
+    
+    print("✅ Hosts are per thread, replaced when dead and closed with their thread")
+
+def main():
+    """Run all tests"""
+    print("\n" + "=" * 80)
+    print("  AUDIT ENGINE - TEST SUITE")
+    print("=" * 80)
+    
+    # Keep the engine's log output out of the test report
+    logging.disable(logging.WARNING)
+    
+    try:
+        test_ttl_cache_evicts_least_recently_used()
+        test_ttl_cache_expires_entries()
+        test_atomic_write_replaces_file()
+        test_pending_writes_commit_together()
+        test_group_commit_writer()
+        test_iter_lines_reversed()
+        test_command_wrapper_framing()
+        test_read_until_marker()
+        test_history_index_tombstones()
+        test_history_index_compaction()
+        test_history_index_rebuild()
+        test_json_report_matches_whole_document()
+        test_csv_report_matches_reference()
+        test_hash_payload_is_backend_independent()
+        test_audit_configuration_is_frozen()
+        test_validate_audit_summary()
+        test_report_paths_survive_reload()
+        test_compliance_trends_and_statistics()
+        test_group_commit_flushes_only_its_files()
+        test_loaded_runs_are_verified()
+        test_finished_run_builds_requested_reports()
+        test_audit_method_names()
+        test_expected_value_comparisons()
+        test_search_bounds_disk_reads()
+        test_report_format_handlers()
+        test_policy_result_cache_follows_policy_state()
+        test_batch_script_and_prefetch()
+        test_process_pool_matches_thread_pool()
+        test_scriptblocks_defined_once()
+        test_policy_snapshot_parsing()
+        test_rule_index_first_match()
+        test_filter_policies_matches_reference()
+        test_compare_audits_classifies_changes()
+        test_configuration_log_replay_and_compaction()
+        test_thread_hosts_are_reused_and_reaped()
+        
+        print_section("TEST SUITE SUMMARY")
+        print("\n✅ All audit engine tests completed successfully!")
+    
+    except Exception as e:
+        print(f"\n❌ Test suite failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()